@@ -1,22 +1,83 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 from dotenv import load_dotenv
+import io
+import logging
 import os
 import json
+import time
+from dataclasses import replace
 from datetime import datetime
+from scraper.business import Business
 from scraper.yelp_api import YelpSearcher
+from scraper.tiling import TiledYelpSearcher
 from scraper.google_scraper import GoogleMapsSearcher
 from scraper.simple_scraper import SimpleGoogleSearcher
 from scraper.yellowpages_scraper import YellowPagesSearcher
 from scraper.working_scraper import WorkingGoogleScraper
 from scraper.simple_reliable_scraper import SimpleReliableScraper
 from scraper.validator import WebsiteValidator
-from scraper.exporter import CSVExporter
+from scraper.validation_cache import ValidationCache
+from scraper.exporter import CSVExporter, FrameExporter
+from scraper.result_cache import ResultCache, CachedSearcher
+from scraper.multi_source import MultiSourceSearcher
+from scraper.batch import BatchScheduler
+from scraper.jobs import JobManager
+from scraper.result_store import ResultStore
+from scraper.lead_store import LeadStore
+from scraper.driver_pool import resolve_chromedriver_in_background
+from scraper.http_client import shared_client
+from scraper.quota import shared_budget
+from scraper.metrics import REGISTRY, families, observe, timed
 
 load_dotenv()
 
+# Quiet unless something goes wrong; LOG_LEVEL=DEBUG shows scraper progress and stage timings
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
+                    format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
+# Shared across requests so its pooled connections are reused
+website_validator = WebsiteValidator(cache=ValidationCache())
+result_cache = ResultCache(disk_path=os.path.join('cache', 'results.db'))
+multi_searcher = MultiSourceSearcher({
+    # Tiles large metros so Yelp's radius and result caps don't truncate them
+    'yelp': CachedSearcher(TiledYelpSearcher(YelpSearcher()), result_cache),
+    'yellowpages': CachedSearcher(YellowPagesSearcher(), result_cache),
+    'google_maps': CachedSearcher(GoogleMapsSearcher(), result_cache),
+}, concurrent_searches=int(os.environ.get('CONCURRENT_SEARCHES', 8)))
+# Per-source concurrency limits for /search/batch sweeps
+batch_scheduler = BatchScheduler(multi_searcher)
+MAX_BATCH_CELLS = int(os.environ.get('MAX_BATCH_CELLS', 500))
+# Bounded so only a few searches (and browsers) run in the background at once
+job_manager = JobManager(max_workers=int(os.environ.get('SEARCH_JOB_WORKERS', 2)))
+# Processed results by id, so /export/<id> doesn't need the list posted back
+result_store = ResultStore()
+# Every lead found so far, queryable through /leads without scraping again
+lead_store = LeadStore()
+
+def _collect_metrics():
+    # Stats the shared components already keep, read on every /metrics scrape
+    return [
+        *families('scraper_http', 'Shared HTTP client, per host', ('host',),
+                  [({'host': host}, _with_units(stats)) for host, stats in shared_client().stats().items()]),
+        *families('scraper_result_cache', 'Search result cache', (),
+                  [({}, result_cache.stats())], gauges=['size']),
+        *families('scraper_validation_cache', 'Website validation cache', (),
+                  [({}, website_validator.cache.stats())], gauges=['hit_rate', 'size']),
+        *families('scraper_quota', 'Daily API quota', ('api',),
+                  [({'api': 'yelp'}, shared_budget('yelp').snapshot())],
+                  gauges=['daily_limit', 'remaining', 'available_low_priority', 'resets_in']),
+    ]
+
+def _with_units(stats):
+    # rate_limit_wait and backoff_wait are seconds
+    return {f'{key}_seconds' if key.endswith('_wait') else key: value for key, value in stats.items()}
+
+REGISTRY.add_collector(_collect_metrics)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -29,82 +90,460 @@ def search():
         state = data.get('state')
         radius = data.get('radius', 5)
         category = data.get('category', 'all')
+        source = data.get('source', 'simple')
         
         if not city or not state:
             return jsonify({'error': 'City and state are required'}), 400
         
         location = f"{city}, {state}"
         
-        # Use simple reliable scraper for consistent results
-        scraper = SimpleReliableScraper()
-        businesses = scraper.search_businesses(location, radius, category)
+        if data.get('async'):
+            # Job mode: return a job id right away and let /jobs/<id> report progress
+            params = {'location': location, 'radius': radius, 'category': category, 'source': source}
+            job = job_manager.submit(params, lambda job: _run_search_job(job, location, radius, category, source))
+            return jsonify({'success': True, 'job_id': job.id, 'status': job.status}), 202
+        
+        if data.get('stream'):
+            # NDJSON: one event per line, rows are sent as soon as they are validated
+            events = _iter_search_events(location, radius, category, source)
+            return Response(stream_with_context(_ndjson_lines(events)), mimetype='application/x-ndjson')
+        
+        source_status = None
+        if source == 'all' or source in multi_searcher.sources:
+            # Fan out to the real sources, each within its own time budget
+            names = None if source == 'all' else [source]
+            outcome = multi_searcher.search(location, radius, category, names)
+            businesses = outcome['businesses']
+            source_status = outcome['sources']
+        else:
+            # Use simple reliable scraper for consistent results
+            scraper = CachedSearcher(SimpleReliableScraper(), result_cache)
+            with timed('fetch', 'simple') as timer:
+                businesses = scraper.search_businesses(location, radius, category)
+                timer.records = len(businesses)
         
         # If no results, provide feedback
         if not businesses:
-            return jsonify({
+            result = {
                 'success': True,
                 'total_found': 0,
                 'without_websites': 0,
                 'businesses': [],
                 'message': f'No {category} businesses found in {location}. Try a different category or location.'
-            })
-        
-        print(f"Processing {len(businesses)} businesses...")
+            }
+            if source_status:
+                result['sources'] = source_status
+            return jsonify(result)
         
-        validator = WebsiteValidator()
         processed_businesses = []
         without_website_count = 0
         
-        for i, business in enumerate(businesses):
-            print(f"Business {i+1}: {business.get('name', 'Unknown')} - URL: {business.get('url', 'No URL')}")
-            has_website = validator.has_website(business)
-            print(f"  Has website: {has_website}")
-            
+        with timed('validation', 'search') as timer:
+            website_flags = website_validator.has_websites(businesses)
+            timer.records = len(businesses)
+        
+        for business, has_website in zip(businesses, website_flags):
             if not has_website:
                 without_website_count += 1
                 
-            processed_businesses.append({
-                'name': business.get('name'),
-                'phone': business.get('display_phone', 'N/A'),
-                'address': ', '.join(business.get('location', {}).get('display_address', [])),
-                'categories': ', '.join([c['title'] for c in business.get('categories', [])]),
-                'rating': business.get('rating', 'N/A'),
-                'review_count': business.get('review_count', 0),
-                'has_website': has_website,
-                'website_url': business.get('url', '')
-            })
+            processed_businesses.append(_format_business(business, has_website))
         
         result = {
             'success': True,
             'total_found': len(businesses),
             'without_websites': without_website_count,
-            'businesses': processed_businesses
+            'result_id': result_store.put(processed_businesses)
         }
+        if source_status:
+            result['sources'] = source_status
         
-        print(f"Returning {len(processed_businesses)} processed businesses to client")
-        print(f"Sample business data: {processed_businesses[0] if processed_businesses else 'None'}")
+        _save_leads(processed_businesses, city, state, category)
+        logger.debug("Returning %d businesses (%d without websites) for %s", len(processed_businesses),
+                     without_website_count, location)
         
-        return jsonify(result)
+        with timed('serialization', 'search') as timer:
+            result['businesses'] = [business.to_dict() for business in processed_businesses]
+            response = jsonify(result)
+            timer.records = len(processed_businesses)
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _format_business(business, has_website, **search):
+    # A copy, since searcher results may be shared through the result cache
+    return replace(business, has_website=has_website, **search)
+
+def _to_json(value):
+    # Records stay compact until they are written out as JSON
+    if isinstance(value, Business):
+        return value.to_dict()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def _ndjson_lines(events):
+    # Serialization time is summed over the stream, leaving out the time spent producing events
+    spent = 0.0
+    rows = 0
+    try:
+        for event in events:
+            started = time.perf_counter()
+            line = json.dumps(event, default=_to_json) + '\n'
+            spent += time.perf_counter() - started
+            rows += event['type'] == 'business'
+            yield line
+    finally:
+        observe('serialization', spent, 'stream', rows)
+
+def _save_leads(processed_businesses, city, state, category):
+    # Placeholder records from the mock fallbacks are shown, but aren't leads
+    leads = [business for business in processed_businesses if not business.mock]
+    if not leads:
+        return
+    # The response doesn't depend on the lead store, so a failed write is only logged
+    try:
+        stats = lead_store.upsert(leads, city, state, category)
+        logger.debug("Lead store: %s", stats)
+    except Exception as e:
+        logger.warning("Error saving leads: %s", e)
+
+def _iter_source_batches(location, radius, category, source):
+    # Yields (source name, businesses, status) as each source finishes
+    if source == 'all' or source in multi_searcher.sources:
+        names = None if source == 'all' else [source]
+        yield from multi_searcher.iter_search(location, radius, category, names)
+    else:
+        scraper = CachedSearcher(SimpleReliableScraper(), result_cache)
+        with timed('fetch', 'simple') as timer:
+            businesses = scraper.search_businesses(location, radius, category)
+            timer.records = len(businesses)
+        yield None, businesses, None
+
+def _iter_search_events(location, radius, category, source):
+    processed_businesses = []
+    source_status = {}
+    deduplicator = multi_searcher.deduplicator
+    # Source order decides whose fields win a merge, as in MultiSourceSearcher.search
+    priority = {name: rank for rank, name in enumerate(multi_searcher.sources)}
+    # The records merged into each streamed row, and the row each blocking key belongs to
+    groups = []
+    rows_by_key = {}
+
+    try:
+        for name, businesses, status in _iter_source_batches(location, radius, category, source):
+            if status:
+                source_status[name] = status
+                yield {'type': 'source', 'source': name, **status}
+
+            fresh = []
+            touched = set()
+            for business in deduplicator.deduplicate(businesses) if deduplicator else businesses:
+                keys = deduplicator.blocking_keys(business) if deduplicator else []
+                row = next((rows_by_key[key] for key in keys if key in rows_by_key), None)
+                if row is None:
+                    fresh.append((business, keys))
+                else:
+                    # Found again by a later source: merge it into the row already sent
+                    groups[row].append(business)
+                    touched.add(row)
+
+            # Merged rows keep their validation unless the merge changed the website
+            revalidate = []
+            for row in sorted(touched):
+                merged = deduplicator.merge(sorted(groups[row], key=lambda b: priority.get(b.source, len(priority))))
+                for key in deduplicator.blocking_keys(merged):
+                    rows_by_key.setdefault(key, row)
+                previous = processed_businesses[row]
+                if merged.url == previous.url:
+                    processed_businesses[row] = _format_business(merged, previous.has_website)
+                    yield {'type': 'update', 'index': row, 'business': processed_businesses[row]}
+                else:
+                    revalidate.append((row, merged))
+
+            # Validation time leaves out the time spent sending each row
+            pending = [business for business, _ in fresh] + [merged for _, merged in revalidate]
+            spent = 0.0
+            started = time.perf_counter()
+            for index, has_website in website_validator.iter_has_websites(pending):
+                processed = _format_business(pending[index], has_website)
+                spent += time.perf_counter() - started
+                if index < len(fresh):
+                    row = len(processed_businesses)
+                    processed_businesses.append(processed)
+                    groups.append([fresh[index][0]])
+                    for key in fresh[index][1]:
+                        rows_by_key.setdefault(key, row)
+                    yield {'type': 'business', 'business': processed}
+                else:
+                    row = revalidate[index - len(fresh)][0]
+                    processed_businesses[row] = processed
+                    yield {'type': 'update', 'index': row, 'business': processed}
+                started = time.perf_counter()
+            observe('validation', spent + time.perf_counter() - started, 'stream', len(pending))
+    except Exception as e:
+        yield {'type': 'error', 'error': str(e)}
+
+    without_website_count = sum(1 for business in processed_businesses if not business.has_website)
+    summary = {
+        'type': 'summary',
+        'success': True,
+        'total_found': len(processed_businesses),
+        'without_websites': without_website_count
+    }
+    if processed_businesses:
+        summary['result_id'] = result_store.put(processed_businesses)
+        city, _, state = location.rpartition(',')
+        _save_leads(processed_businesses, city, state, category)
+    if source_status:
+        summary['sources'] = source_status
+    if not processed_businesses:
+        summary['message'] = f'No {category} businesses found in {location}. Try a different category or location.'
+    yield summary
+
+def _run_search_job(job, location, radius, category, source):
+    summary = None
+    for event in _iter_search_events(location, radius, category, source):
+        if event['type'] == 'business':
+            job.add_result(event['business'])
+            job.update(processed=len(job.results))
+        elif event['type'] == 'update':
+            job.replace_result(event['index'], event['business'])
+        elif event['type'] == 'source':
+            status = {key: value for key, value in event.items() if key not in ('type', 'source')}
+            job.update(sources={**job.progress.get('sources', {}), event['source']: status})
+        elif event['type'] == 'error':
+            raise RuntimeError(event['error'])
+        elif event['type'] == 'summary':
+            summary = {key: value for key, value in event.items() if key != 'type'}
+    return summary
+
+@app.route('/search/batch', methods=['POST'])
+def search_batch():
+    data = request.json or {}
+    radius = data.get('radius', 5)
+    source = data.get('source', 'all')
+    
+    categories = data.get('categories')
+    if categories is not None and (not isinstance(categories, list)
+                                   or not all(isinstance(c, str) and c.strip() for c in categories)):
+        return jsonify({'error': 'categories must be a list of category names'}), 400
+    # Defaults to every trade the scrapers know about
+    categories = [category.strip() for category in categories] if categories else list(YellowPagesSearcher.category_map)
+    
+    if not isinstance(data.get('locations', []), list):
+        return jsonify({'error': 'locations must be a list of "City, ST" strings or {"city", "state"} objects'}), 400
+    
+    locations = []
+    for entry in data.get('locations', []):
+        if isinstance(entry, dict):
+            city, state = entry.get('city'), entry.get('state')
+        elif isinstance(entry, str):
+            city, _, state = entry.rpartition(',')
+        else:
+            city = state = None
+        if not city or not state or not str(city).strip() or not str(state).strip():
+            return jsonify({'error': f'Invalid location: {entry} (expected "City, ST" or {{"city", "state"}})'}), 400
+        locations.append(f"{str(city).strip()}, {str(state).strip()}")
+    
+    if not locations:
+        return jsonify({'error': 'At least one location is required'}), 400
+    
+    # A comma-separated string or a list of source names
+    requested = source.split(',') if isinstance(source, str) else source
+    if not isinstance(requested, list) or not all(isinstance(name, str) for name in requested):
+        return jsonify({'error': 'source must be "all" or source names, as a list or comma-separated string'}), 400
+    
+    requested = [name.strip() for name in requested]
+    names = list(multi_searcher.sources) if requested == ['all'] else [name for name in requested if name in multi_searcher.sources]
+    if not names:
+        return jsonify({'error': f'Unknown source: {source}'}), 400
+    
+    cells = len(locations) * len(categories)
+    if cells > MAX_BATCH_CELLS:
+        return jsonify({'error': f'Batch too large: {cells} location/category pairs (limit {MAX_BATCH_CELLS})'}), 400
+    
+    params = {'batch': True, 'locations': locations, 'radius': radius, 'categories': categories, 'sources': names}
+    job = job_manager.submit(params, lambda job: _run_batch_job(job, locations, radius, categories, names))
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'cells': cells,
+        'tasks': cells * len(names)
+    }), 202
+
+def _run_batch_job(job, locations, radius, categories, names):
+    started = time.monotonic()
+    all_processed = []
+    without_website_count = 0
+    source_progress = {name: {'done': 0, 'failed': 0, 'partial': 0, 'found': 0} for name in names}
+    
+    job.update(
+        cells_total=len(locations) * len(categories),
+        cells_done=0,
+        tasks_total=len(locations) * len(categories) * len(names),
+        tasks_done=0,
+        sources=source_progress,
+        found=0,
+        without_websites=0
+    )
+    
+    def on_task(name, status):
+        progress = source_progress[name]
+        progress['done'] += 1
+        progress['found'] += status['count']
+        if status['status'] == 'partial':
+            # e.g. Yelp pages shed to keep within its daily quota; nothing retries them
+            progress['partial'] += 1
+        elif status['status'] != 'ok':
+            progress['failed'] += 1
+        job.update(
+            tasks_done=job.progress['tasks_done'] + 1,
+            sources={source: dict(counts) for source, counts in source_progress.items()},
+            elapsed=round(time.monotonic() - started, 1)
+        )
+    
+    for cell in batch_scheduler.run(locations, radius, categories, names, on_task=on_task):
+        businesses = cell['businesses']
+        with timed('validation', 'batch') as timer:
+            website_flags = website_validator.has_websites(businesses)
+            timer.records = len(businesses)
+        
+        processed_businesses = []
+        for business, has_website in zip(businesses, website_flags):
+            if not has_website:
+                without_website_count += 1
+            processed = _format_business(business, has_website,
+                                         query_location=cell['location'], query_category=cell['category'])
+            processed_businesses.append(processed)
+            job.add_result(processed)
+        
+        city, _, state = cell['location'].rpartition(',')
+        _save_leads(processed_businesses, city, state, cell['category'])
+        all_processed.extend(processed_businesses)
+        
+        job.update(
+            cells_done=job.progress['cells_done'] + 1,
+            found=len(all_processed),
+            without_websites=without_website_count
+        )
+    
+    summary = {
+        'success': True,
+        'total_found': len(all_processed),
+        'without_websites': without_website_count,
+        'sources': source_progress,
+        'elapsed': round(time.monotonic() - started, 1)
+    }
+    if all_processed:
+        summary['result_id'] = result_store.put(all_processed)
+    return summary
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    # Pollers pass ?since=<result_count> to fetch only the rows they haven't seen
+    since = request.args.get('since', 0, type=int)
+    with timed('serialization', 'jobs'):
+        return jsonify(job.to_dict(since))
+
+@app.route('/leads')
+def leads():
+    has_website = request.args.get('has_website')
+    if has_website is not None:
+        has_website = has_website.lower() in ('1', 'true', 'yes')
+    
+    try:
+        limit = int(request.args.get('limit', 100))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+    
+    businesses = lead_store.query(
+        city=request.args.get('city'),
+        state=request.args.get('state'),
+        category=request.args.get('category'),
+        has_website=has_website,
+        phone=request.args.get('phone'),
+        # SQLite reads a negative LIMIT as no limit at all
+        limit=max(1, min(limit, 1000)),
+        offset=max(0, offset)
+    )
+    
+    result = {
+        'success': True,
+        'total_found': len(businesses),
+        'without_websites': sum(1 for business in businesses if not business.has_website),
+        'businesses': [business.to_dict() for business in businesses]
+    }
+    if businesses:
+        result['result_id'] = result_store.put(businesses)
+    return jsonify(result)
+
 @app.route('/export', methods=['POST'])
 def export():
     try:
         data = request.json
-        businesses = data.get('businesses', [])
+        businesses = [Business.from_json(business) for business in data.get('businesses', [])]
         
         if not businesses:
             return jsonify({'error': 'No businesses to export'}), 400
         
-        exporter = CSVExporter()
-        filename = exporter.export(businesses)
+        export_format = data.get('format', 'csv')
+        if export_format != 'csv':
+            return _send_frame(businesses, export_format)
         
-        return send_file(filename, as_attachment=True, download_name=f'businesses_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
+        return _stream_csv(businesses)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/export/<result_id>')
+def export_result(result_id):
+    businesses = result_store.get(result_id)
+    if businesses is None:
+        return jsonify({'error': 'Results not found or expired'}), 404
+    
+    export_format = request.args.get('format', 'csv')
+    if export_format != 'csv':
+        return _send_frame(businesses, export_format)
+    
+    return _stream_csv(businesses)
+
+@app.route('/metrics')
+def metrics():
+    # Prometheus text format: per-stage timings plus HTTP client, cache and quota stats
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+def _stream_csv(businesses):
+    # Rows are serialized as the response is sent; nothing is written to disk
+    filename = f'businesses_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    return Response(
+        stream_with_context(CSVExporter().iter_csv(businesses)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+def _send_frame(businesses, export_format):
+    """Respond with the results as a Parquet, Arrow IPC or gzipped CSV file."""
+    exporter = FrameExporter()
+    if export_format not in exporter.formats:
+        supported = ', '.join(['csv'] + list(exporter.formats))
+        return jsonify({'error': f'Unsupported format: {export_format} (expected one of {supported})'}), 400
+    
+    mimetype, extension = exporter.formats[export_format]
+    data = exporter.export_bytes(businesses, export_format)
+    
+    return send_file(
+        io.BytesIO(data),
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=f'businesses_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+    )
+
 if __name__ == '__main__':
+    # Only when run directly, so imports (benchmarks, load tests, WSGI servers) stay offline
+    resolve_chromedriver_in_background()
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Time cross-source deduplication on a large synthetic result set.
+
+Usage: python benchmarks/bench_dedup.py [--records N] [--rounds N] [--budget S]
+
+Builds --records listings for distinct businesses, each found by one to
+three sources with the formatting differences the real searchers produce:
+phone formats, 'LLC'/'The' in names, 'Street' vs 'St' and suite numbers in
+addresses, and some listings without a phone. Checks that every business
+comes out as exactly one record, then reports p50/p95 per deduplicate()
+call. Exits with status 1 if the p50 is over --budget seconds.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.business import Business
+from scraper.dedup import BusinessDeduplicator
+
+SOURCES = ['yelp', 'yellowpages', 'google_maps']
+TRADES = ['Plumbing', 'Electric', 'Roofing', 'Heating & Air', 'Landscaping', 'Dental', 'Auto Repair']
+STREETS = [('Main', 'Street', 'St'), ('Oak', 'Avenue', 'Ave'), ('Lamar', 'Boulevard', 'Blvd'),
+           ('Congress', 'Avenue', 'Ave'), ('Burnet', 'Road', 'Rd'), ('Cedar', 'Lane', 'Ln')]
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def listings(count, seed=1):
+    """About count listings and the number of distinct businesses behind them."""
+    rng = random.Random(seed)
+    records = []
+    businesses = 0
+
+    while len(records) < count:
+        number = businesses
+        businesses += 1
+        # Unique per business: the phone, and the owner's name plus street number
+        area, exchange, line = 200 + number // 1000000 % 800, 200 + number // 10000 % 100, number % 10000
+        name = f"{'Owner%d' % number} {rng.choice(TRADES)}"
+        street, long_type, short_type = rng.choice(STREETS)
+        street_number = 100 + number
+
+        for source in rng.sample(SOURCES, rng.randint(1, 3)):
+            if source == 'yelp':
+                phone = f'({area}) {exchange}-{line:04d}'
+                address = f'{street_number} {street} {short_type}, Austin, TX 78701'
+                display_name = name
+                url = f'https://www.yelp.com/biz/owner{number}'
+            elif source == 'yellowpages':
+                phone = f'{area}-{exchange}-{line:04d}'
+                address = f'{street_number} {street} {long_type} Suite {rng.randint(1, 300)}, Austin, TX'
+                display_name = f'{name} LLC'
+                url = f'http://owner{number}.example.com'
+            else:
+                # Maps often has no phone, so these only match on name and street
+                phone = '' if rng.random() < 0.3 else f'+1 {area} {exchange} {line:04d}'
+                address = f'{street_number} {street} {short_type}, Austin'
+                display_name = f'The {name}'
+                url = ''
+            records.append(Business(name=display_name, phone=phone, address=address, url=url, source=source,
+                                    rating=round(rng.uniform(3, 5), 1), review_count=rng.randint(0, 500)))
+
+    return records, businesses
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=50000, help='listings per deduplicate() call')
+    parser.add_argument('--rounds', type=int, default=10, help='timed deduplicate() calls')
+    parser.add_argument('--budget', type=float, default=1.0, help='seconds allowed for the p50 call')
+    args = parser.parse_args()
+
+    records, businesses = listings(args.records)
+    deduplicator = BusinessDeduplicator()
+
+    merged = deduplicator.deduplicate(records)
+    if len(merged) != businesses:
+        sys.exit(f'Expected {businesses} businesses, deduplicate() returned {len(merged)}')
+
+    gc.collect()
+    durations = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        deduplicator.deduplicate(records)
+        durations.append(time.perf_counter() - start)
+
+    p50 = percentile(durations, 0.5)
+    print(f"{len(records)} listings -> {businesses} businesses, {args.rounds} rounds")
+    print(f"p50 {p50 * 1000:.1f} ms, p95 {percentile(durations, 0.95) * 1000:.1f} ms, "
+          f"{len(records) / p50:,.0f} records/sec")
+
+    if p50 > args.budget:
+        sys.exit(f'p50 is over the {args.budget:.2f}s budget')
+
+if __name__ == '__main__':
+    main()
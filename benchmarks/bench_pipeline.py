@@ -0,0 +1,236 @@
+"""
+Run synthetic Yelp, Yellow Pages and Google Maps results through the whole pipeline.
+
+Usage: python benchmarks/bench_pipeline.py [--rounds N] [--latency MS] [--save-baseline]
+
+Every searcher runs its real request, pagination and parsing code against
+a local stub server (benchmarks/stub_server.py) serving the synthetic
+pages in benchmarks/fixtures; the Google Maps searcher drives Chrome over
+the fixture results feed and is skipped when Chrome or its driver isn't
+available. The validator checks the found websites against the stub and
+the exporters write the results out. For each stage the script reports
+records/sec and p50/p95 latency per call and compares them with
+benchmarks/baseline.json; it exits with status 1 if a stage's p50 got
+slower than the baseline's by more than --tolerance. Baselines are only
+comparable on the machine they were recorded on, so record one
+(--save-baseline) wherever the check runs.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer
+from scraper.exporter import CSVExporter, FrameExporter
+from scraper.google_scraper import GoogleMapsSearcher
+from scraper.http_client import HttpClient
+from scraper.metrics import STAGE_SECONDS
+from scraper.quota import QuotaBudget
+from scraper.validator import WebsiteValidator
+from scraper.yellowpages_scraper import YellowPagesSearcher
+from scraper.yelp_api import YelpSearcher
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+LOCATION = 'Austin, TX'
+CATEGORY = 'plumber'
+CHROME_BINARIES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+class Stage:
+    """One benchmarked step: a callable returning the records it produced."""
+
+    def __init__(self, name, run, rounds):
+        self.name = name
+        self.run = run
+        self.rounds = rounds
+        self.durations = []
+        self.records = 0
+        self.output = []
+
+    def measure(self):
+        # One untimed call, so connection pools, drivers and parsers are warm
+        self.output = self.run()
+        gc.collect()
+        for _ in range(self.rounds):
+            start = time.perf_counter()
+            output = self.run()
+            self.durations.append(time.perf_counter() - start)
+            self.records += len(output)
+        return self
+
+    def summary(self):
+        # Rates come from the median call, so one stalled call on a busy machine doesn't skew them
+        p50 = percentile(self.durations, 0.5)
+        return {
+            'records_per_sec': round(self.records / len(self.durations) / p50, 1),
+            'p50_ms': round(p50 * 1000, 2),
+            'p95_ms': round(percentile(self.durations, 0.95) * 1000, 2),
+        }
+
+def stub_client():
+    # Everything is on one local host; the real per-host rate limits would only measure the limiter
+    return HttpClient(rates={'127.0.0.1': (100000, 100000)}, default_rate=(100000, 100000))
+
+def yelp_stage(stub, client, rounds):
+    searcher = YelpSearcher(client=client, budget=QuotaBudget(daily_limit=10 ** 9))
+    searcher.api_key = 'benchmark'
+    searcher.base_url = f'{stub.url}/v3/businesses/search'
+    return Stage('yelp_search', lambda: searcher.search_businesses(LOCATION, 5, CATEGORY), rounds)
+
+def yelp_parse_stage(stub, rounds):
+    pages = [json.loads(body) for _, body in sorted(stub.fixtures.yelp_pages.items())]
+    searcher = YelpSearcher(budget=QuotaBudget())
+    return Stage('yelp_parse', lambda: [b for page in pages for b in searcher._businesses(page)], rounds)
+
+def yellowpages_stage(stub, client, rounds):
+    searcher = YellowPagesSearcher(client=client)
+    searcher.base_url = stub.url
+    return Stage('yellowpages_search', lambda: searcher.search_businesses(LOCATION, 5, CATEGORY), rounds)
+
+def yellowpages_parse_stage(stub, rounds):
+    pages = [body.decode('utf-8') for body in stub.fixtures.yellowpages_pages]
+    searcher = YellowPagesSearcher()
+    return Stage('yellowpages_parse', lambda: [b for html in pages for b in searcher._parse_page(html, CATEGORY)], rounds)
+
+def google_maps_stage(stub, rounds):
+    """The Maps stage, or None (with the reason printed) when Chrome can't be started."""
+    if not any(shutil.which(binary) for binary in CHROME_BINARIES):
+        print('Skipping google_maps_search: Chrome not found')
+        return None
+
+    from scraper.driver_pool import DriverPool
+    pool = DriverPool(GoogleMapsSearcher._chrome_options, size=2)
+    try:
+        pool.checkin(pool.checkout(timeout=60))
+    except Exception as e:
+        print(f'Skipping google_maps_search: could not start Chrome ({e})')
+        return None
+
+    searcher = GoogleMapsSearcher(pool=pool)
+    searcher.base_url = f'{stub.url}/maps/search/'
+    return Stage('google_maps_search', lambda: searcher.search_businesses(LOCATION, 5, CATEGORY), rounds)
+
+def validation_stage(stub, client, businesses, rounds):
+    # The fixture websites are made-up domains; point every one at the stub instead
+    candidates = [replace(business, url=f'{stub.url}/site/{index}')
+                  for index, business in enumerate(b for b in businesses if b.url and 'yelp.com' not in b.url)]
+    # No cache, so every round makes live checks; the stub stands in for many distinct hosts
+    validator = WebsiteValidator(cache=None, client=client, per_host_limit=32)
+    return Stage('validation', lambda: validator.has_websites(candidates), rounds)
+
+def export_stages(businesses, rows, rounds):
+    batch = (businesses * (rows // max(len(businesses), 1) + 1))[:rows]
+    batch = [replace(business, has_website=index % 3 != 0) for index, business in enumerate(batch)]
+    csv_exporter = CSVExporter()
+    frame_exporter = FrameExporter()
+
+    def export_csv():
+        ''.join(csv_exporter.iter_csv(batch))
+        return batch
+
+    stages = [Stage('export_csv', export_csv, rounds)]
+    for fmt in ('parquet', 'arrow', 'csv.gz'):
+        stages.append(Stage(f'export_{fmt}', lambda fmt=fmt: frame_exporter.export_bytes(batch, fmt) and batch, rounds))
+    return stages
+
+def compare(result, baseline, tolerance):
+    """Change against the baseline as text, and whether it is a regression."""
+    if not baseline or not baseline['p50_ms']:
+        return 'new', False
+    slower = result['p50_ms'] / baseline['p50_ms'] - 1
+    return f'{slower:+.0%} p50', slower > tolerance
+
+def stage_breakdown():
+    # Time per call of the instrumented stages inside the searchers, validator and exporters
+    totals = {}
+    for name, labels, value in STAGE_SECONDS.samples():
+        key = (labels['stage'], labels['source'])
+        if name.endswith('_sum'):
+            totals.setdefault(key, [0, 0])[0] = value
+        elif name.endswith('_count'):
+            totals.setdefault(key, [0, 0])[1] = value
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=20, help='timed calls per stage')
+    parser.add_argument('--browser-rounds', type=int, default=3, help='timed calls for the Chrome stage')
+    parser.add_argument('--latency', type=float, default=0, help='milliseconds the stub adds to every response')
+    parser.add_argument('--export-rows', type=int, default=5000, help='records per export call')
+    # Loose by default: repeated runs on a shared machine differ by up to about 40%
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed p50 slowdown before a stage fails')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--skip-browser', action='store_true', help="don't run the Chrome stage")
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency / 1000) as stub:
+        client = stub_client()
+
+        stages = [
+            yelp_parse_stage(stub, args.rounds).measure(),
+            yelp_stage(stub, client, args.rounds).measure(),
+            yellowpages_parse_stage(stub, args.rounds).measure(),
+            yellowpages_stage(stub, client, args.rounds).measure(),
+        ]
+        maps = None if args.skip_browser else google_maps_stage(stub, args.browser_rounds)
+        if maps:
+            stages.append(maps.measure())
+
+        found = [business for stage in stages if stage.name.endswith('_search') for business in stage.output]
+        if not found:
+            sys.exit('The searchers found nothing; check benchmarks/fixtures')
+
+        stages.append(validation_stage(stub, client, found, args.rounds).measure())
+        stages.extend(stage.measure() for stage in export_stages(found, args.export_rows, args.rounds))
+        requests = stub.requests
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('stages', {})
+
+    results = {stage.name: stage.summary() for stage in stages}
+    regressions = []
+
+    print(f"{len(found)} businesses found, {requests} stub requests, {args.rounds} rounds")
+    print(f"{'stage':<20} {'records/sec':>12} {'p50 ms':>9} {'p95 ms':>9}  vs baseline")
+    for name, result in results.items():
+        change, regressed = compare(result, baseline.get(name), args.tolerance)
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<20} {result['records_per_sec']:>12.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f}  "
+              f"{change}{'  REGRESSION' if regressed else ''}")
+
+    print(f"\n{'instrumented stage':<34} {'calls':>7} {'mean ms':>9}")
+    for (stage, source), (total, count) in sorted(stage_breakdown().items()):
+        if count:
+            label = f'{stage}[{source}]' if source else stage
+            print(f"{label:<34} {int(count):>7} {total / count * 1000:>9.2f}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'recorded': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'stages': results
+            }, f, indent=2)
+            f.write('\n')
+        print(f'\nBaseline written to {args.baseline}')
+    elif regressions:
+        sys.exit(f"\nSlower than the baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+
+if __name__ == '__main__':
+    main()
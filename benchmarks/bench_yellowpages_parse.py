@@ -0,0 +1,59 @@
+"""
+Compare Yellow Pages parsing backends on synthetic result pages.
+
+Usage: python benchmarks/bench_yellowpages_parse.py [--rounds N]
+
+Every backend must produce the same business dicts as the original
+full-tree BeautifulSoup parser; the script fails if one doesn't.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.yellowpages_scraper import YellowPagesSearcher, lxml
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'yellowpages', '*.html')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=20, help='passes over the fixture pages per backend')
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+
+    if not pages:
+        sys.exit(f'No fixtures found at {FIXTURES}')
+
+    backends = ['soup', 'strained'] + (['lxml'] if lxml else [])
+    expected = [YellowPagesSearcher(parser='soup')._parse_page(html, 'plumber') for html in pages]
+    baseline_rate = None
+
+    print(f"{len(pages)} pages, {sum(len(r) for r in expected)} listings, {args.rounds} rounds")
+    print(f"{'backend':<10} {'pages/sec':>10} {'speedup':>8}")
+
+    for backend in backends:
+        searcher = YellowPagesSearcher(parser=backend)
+
+        results = [searcher._parse_page(html, 'plumber') for html in pages]
+        if results != expected:
+            sys.exit(f'{backend} parser output differs from the full-tree parser')
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for html in pages:
+                searcher._parse_page(html, 'plumber')
+        elapsed = time.perf_counter() - start
+
+        rate = args.rounds * len(pages) / elapsed
+        baseline_rate = baseline_rate or rate
+        print(f"{backend:<10} {rate:>10.1f} {rate / baseline_rate:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
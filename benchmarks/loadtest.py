@@ -0,0 +1,296 @@
+"""
+Load-test the Flask app end to end against local Yelp and Yellow Pages stand-ins.
+
+Usage: python benchmarks/loadtest.py [--users N] [--duration S] [--yelp-latency MS] [--yp-error-rate F] ...
+
+Starts a Yelp and a Yellow Pages stand-in (benchmarks/stub_server.py)
+with their own latency and error rate, plus stand-ins for the listed
+businesses' websites, then starts app.py with
+YELP_API_URL and YELLOWPAGES_URL pointing at them, in a scratch working
+directory so its caches and lead store start empty. --users virtual users
+then repeatedly search (POST /search) and export what they found
+(GET /export/<result_id>) for --duration seconds. Throughput, p50/p95/p99
+latency, error rates and the share of degraded (a source failed) and empty
+searches are reported per endpoint, along with where the app spent its
+time (from its /metrics).
+
+With --target, the app is not started: run it yourself (e.g. under a
+production server) with the environment printed at startup, so different
+server setups can be compared under the same load.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATEGORIES = ['plumber', 'electrician', 'roofing', 'hvac', 'landscaping', 'dentist']
+STATES = ['TX', 'CA', 'FL', 'NY', 'IL', 'WA', 'CO', 'GA']
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+class Results:
+    """Latency and outcome of every request, by endpoint."""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, seconds, error=None, degraded=False, empty=False):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append((seconds, error, degraded, empty))
+
+    def report(self, elapsed):
+        rows = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            latencies = [seconds for seconds, _, _, _ in samples]
+            errors = [error for _, error, _, _ in samples if error]
+            rows[endpoint] = {
+                'requests': len(samples),
+                'throughput': round(len(samples) / elapsed, 2),
+                'p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+                'max_ms': round(max(latencies) * 1000, 1),
+                'error_rate': round(len(errors) / len(samples), 4),
+                'degraded_rate': round(sum(1 for _, _, degraded, _ in samples if degraded) / len(samples), 4),
+                'empty_rate': round(sum(1 for _, _, _, empty in samples if empty) / len(samples), 4),
+                'errors': sorted(set(errors))[:5]
+            }
+        return rows
+
+class VirtualUser(threading.Thread):
+    """Searches and exports in a loop, like a user working through locations."""
+
+    # Shared by all users so searches are spread across cities and only repeat when asked to
+    _cities = itertools.count(1)
+    _searched = []
+    _searched_lock = threading.Lock()
+
+    def __init__(self, base_url, args, results, stop_at):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.args = args
+        self.results = results
+        self.stop_at = stop_at
+        self.session = requests.Session()
+        self.random = random.Random()
+
+    def run(self):
+        while time.monotonic() < self.stop_at:
+            result_id = self.search()
+            if result_id and self.random.random() < self.args.export_ratio:
+                self.export(result_id, self.random.choice(self.args.export_formats))
+            if self.args.think_time:
+                time.sleep(self.random.uniform(0, 2 * self.args.think_time))
+
+    def search(self):
+        source = self.random.choice(self.args.sources)
+        payload = {**self.location(), 'category': self.random.choice(CATEGORIES), 'source': source}
+
+        start = time.monotonic()
+        try:
+            response = self.session.post(f'{self.base_url}/search', json=payload, timeout=self.args.timeout)
+            body = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.results.add(f'search:{source}', time.monotonic() - start, type(e).__name__)
+            return None
+        elapsed = time.monotonic() - start
+
+        error = None if response.ok and body.get('success') else f'HTTP {response.status_code}'
+        # Answered, but a source failed, timed out or stopped early behind the scenes
+        degraded = any(status.get('status') != 'ok' for status in (body.get('sources') or {}).values())
+        # Yellow Pages reports a failed crawl as no results, so watch for those too
+        empty = not error and not body.get('total_found')
+        self.results.add(f'search:{source}', elapsed, error, degraded, empty)
+        return body.get('result_id')
+
+    def export(self, result_id, export_format):
+        start = time.monotonic()
+        try:
+            response = self.session.get(f'{self.base_url}/export/{result_id}', params={'format': export_format},
+                                        timeout=self.args.timeout)
+            error = None if response.ok else f'HTTP {response.status_code}'
+        except requests.RequestException as e:
+            error = type(e).__name__
+        self.results.add(f'export:{export_format}', time.monotonic() - start, error)
+
+    def location(self):
+        # New cities miss the app's result cache; --repeat of the searches go back to one already searched
+        with self._searched_lock:
+            if self._searched and self.random.random() < self.args.repeat:
+                return self.random.choice(self._searched)
+            number = next(self._cities)
+            location = {'city': f'Loadtest City {number}', 'state': STATES[number % len(STATES)]}
+            self._searched.append(location)
+            return location
+
+def app_environment(yelp, yellowpages, args):
+    return {
+        'YELP_API_URL': f'{yelp.url}/v3/businesses/search',
+        'YELLOWPAGES_URL': yellowpages.url,
+        'YELP_API_KEY': 'loadtest',
+        'YELP_DAILY_LIMIT': str(10 ** 9),
+        # Both stand-ins are on 127.0.0.1; --upstream-rate stands in for the real per-host limits
+        'HTTP_RATE_LIMITS': json.dumps({'127.0.0.1': [args.upstream_rate, args.upstream_rate * 2]}),
+    }
+
+def start_app(environment, port, workdir):
+    command = [sys.executable, '-m', 'flask', '--app', os.path.join(REPO, 'app.py'), 'run',
+               '--port', str(port), '--no-reload', '--no-debugger', '--with-threads']
+    process = subprocess.Popen(command, cwd=workdir, env={**os.environ, **environment},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    base_url = f'http://127.0.0.1:{port}'
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f'app.py exited during startup:\n{process.stderr.read()}')
+        try:
+            requests.get(f'{base_url}/metrics', timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+
+    process.terminate()
+    sys.exit('app.py did not start within 60 seconds')
+
+def stage_times(base_url):
+    """(stage, source) -> (total seconds, calls) from the app's scraper_stage_seconds histogram."""
+    try:
+        text = requests.get(f'{base_url}/metrics', timeout=5).text
+    except requests.RequestException:
+        return {}
+
+    totals = {}
+    for line in text.splitlines():
+        if not line.startswith(('scraper_stage_seconds_sum', 'scraper_stage_seconds_count')):
+            continue
+        name, _, value = line.rpartition(' ')
+        labels = dict(part.split('=', 1) for part in name[name.index('{') + 1:-1].split(','))
+        key = (labels['stage'].strip('"'), labels['source'].strip('"'))
+        index = 0 if name.startswith('scraper_stage_seconds_sum') else 1
+        totals.setdefault(key, [0.0, 0])[index] = float(value)
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run after ramp-up starts')
+    parser.add_argument('--ramp-up', type=float, default=5, help='seconds over which users are started')
+    parser.add_argument('--think-time', type=float, default=0, help='mean seconds a user pauses between actions')
+    parser.add_argument('--sources', default='yelp,yellowpages', help='comma-separated search sources to pick from')
+    parser.add_argument('--export-ratio', type=float, default=0.5, help='share of searches followed by an export')
+    parser.add_argument('--export-formats', default='csv', help='comma-separated export formats to pick from')
+    parser.add_argument('--repeat', type=float, default=0.2, help='share of searches repeating an earlier location')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds before a request counts as failed')
+    parser.add_argument('--yelp-latency', type=float, default=150, help='milliseconds per Yelp stand-in response')
+    parser.add_argument('--yelp-error-rate', type=float, default=0.0, help='share of Yelp stand-in responses that are 503s')
+    parser.add_argument('--yp-latency', type=float, default=400, help='milliseconds per Yellow Pages stand-in response')
+    parser.add_argument('--yp-error-rate', type=float, default=0.0, help='share of Yellow Pages stand-in responses that are 503s')
+    parser.add_argument('--site-latency', type=float, default=100, help='milliseconds per business website check')
+    parser.add_argument('--site-hosts', type=int, default=8, help='servers the business websites are spread over')
+    parser.add_argument('--upstream-rate', type=float, default=1000, help='requests/sec the app may send each stand-in')
+    parser.add_argument('--port', type=int, default=5055, help='port for the app when the tool starts it')
+    parser.add_argument('--target', help="URL of an app you started yourself; it isn't started here")
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+    args.sources = args.sources.split(',')
+    args.export_formats = args.export_formats.split(',')
+
+    yelp = StubServer(latency=args.yelp_latency / 1000, error_rate=args.yelp_error_rate).start()
+    # Listed websites are spread over several servers, since the validator limits checks per host
+    websites = [StubServer(latency=args.site_latency / 1000).start() for _ in range(args.site_hosts)]
+    yellowpages = StubServer(latency=args.yp_latency / 1000, error_rate=args.yp_error_rate,
+                             website_urls=[server.url for server in websites]).start()
+    environment = app_environment(yelp, yellowpages, args)
+
+    process = None
+    workdir = tempfile.TemporaryDirectory(prefix='loadtest-')
+    try:
+        if args.target:
+            base_url = args.target.rstrip('/')
+            print('Start the app with:')
+            for name, value in environment.items():
+                print(f"  {name}='{value}'")
+            input('Press Enter once it is running... ')
+        else:
+            process, base_url = start_app(environment, args.port, workdir.name)
+
+        results = Results()
+        started = time.monotonic()
+        stop_at = started + args.duration
+        users = []
+        print(f'{args.users} users for {args.duration:.0f}s against {base_url}')
+        for index in range(args.users):
+            user = VirtualUser(base_url, args, results, stop_at)
+            user.start()
+            users.append(user)
+            time.sleep(args.ramp_up / args.users)
+        for user in users:
+            user.join()
+        elapsed = time.monotonic() - started
+
+        report = results.report(elapsed)
+        stages = stage_times(base_url)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+        for server in [yelp, yellowpages, *websites]:
+            server.stop()
+        workdir.cleanup()
+
+    if not report:
+        sys.exit('No requests completed')
+
+    total = sum(row['requests'] for row in report.values())
+    print(f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s")
+    print(f"{'endpoint':<22} {'reqs':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'errors':>7} {'degraded':>9} {'empty':>7}")
+    for endpoint, row in report.items():
+        print(f"{endpoint:<22} {row['requests']:>6} {row['throughput']:>7.2f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+              f"{row['p99_ms']:>8.1f} {row['max_ms']:>8.1f} {row['error_rate']:>7.1%} {row['degraded_rate']:>9.1%} "
+              f"{row['empty_rate']:>7.1%}")
+        for error in row['errors']:
+            print(f"{'':<22} error: {error}")
+
+    print(f"\nUpstream stand-ins: Yelp {yelp.requests} requests ({yelp.errors} injected errors), "
+          f"Yellow Pages {yellowpages.requests} requests ({yellowpages.errors} injected errors), "
+          f"websites {sum(server.requests for server in websites)} checks")
+
+    if stages:
+        print(f"\n{'app stage':<30} {'calls':>7} {'mean ms':>9} {'total s':>9}")
+        for (stage, source), (seconds, calls) in sorted(stages.items(), key=lambda item: -item[1][0]):
+            if calls:
+                label = f'{stage}[{source}]' if source else stage
+                print(f"{label:<30} {int(calls):>7} {seconds / calls * 1000:>9.1f} {seconds:>9.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'settings': {key: value for key, value in vars(args).items() if key != 'json'},
+                'elapsed': round(elapsed, 2),
+                'throughput': round(total / elapsed, 2),
+                'endpoints': report,
+                'stages': {f'{stage}[{source}]': {'calls': calls, 'seconds': round(seconds, 3)}
+                           for (stage, source), (seconds, calls) in stages.items()}
+            }, f, indent=2)
+            f.write('\n')
+
+if __name__ == '__main__':
+    main()
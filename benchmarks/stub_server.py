@@ -0,0 +1,193 @@
+"""
+Local stand-in for the Yelp API, Yellow Pages and Google Maps.
+
+Serves the pages in benchmarks/fixtures so the searchers run their real
+request, pagination and parsing code without touching the network. The
+fixtures are synthetic, not captured from the sites: made-up businesses
+(555 phone numbers, invented names and domains) laid out in each site's
+response format. Parsing timings against live pages may differ.
+
+  GET  /v3/businesses/search?offset=N   synthetic Yelp search pages
+  GET  /search?...&page=N               synthetic Yellow Pages result pages
+  GET  /maps/search/<query>             synthetic Google Maps results feed
+  GET  /maps/place/<slug>               place panel with the business's website link
+  HEAD /site/<n>                        a business website (every 4th one is gone: 404)
+
+Both the benchmarks and the load test (benchmarks/loadtest.py) use it.
+"""
+import glob
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, unquote, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+EMPTY_YELLOWPAGES_PAGE = '<!DOCTYPE html><html><head><title>No results</title></head><body></body></html>'
+
+WEBSITE_LINK = re.compile(rb'(class="track-visit-website" href=")(https?://[^"]+)(")')
+
+class Fixtures:
+    def __init__(self, path: str = FIXTURES):
+        self.yelp_pages = {}
+        for name in glob.glob(os.path.join(path, 'yelp', '*_offset*.json')):
+            offset = int(re.search(r'_offset(\d+)\.json$', name).group(1))
+            with open(name, encoding='utf-8') as f:
+                self.yelp_pages[offset] = f.read().encode('utf-8')
+        self.yelp_total = json.loads(self.yelp_pages[0])['total'] if 0 in self.yelp_pages else 0
+
+        self.yellowpages_pages = []
+        for name in sorted(glob.glob(os.path.join(path, 'yellowpages', '*_page*.html'))):
+            with open(name, encoding='utf-8') as f:
+                self.yellowpages_pages.append(f.read().encode('utf-8'))
+
+        self.maps_results = b''
+        self.maps_places = {}
+        for name in glob.glob(os.path.join(path, 'google_maps', '*_results.html')):
+            with open(name, encoding='utf-8') as f:
+                self.maps_results = f.read().encode('utf-8')
+        for name in glob.glob(os.path.join(path, 'google_maps', '*_places.json')):
+            with open(name, encoding='utf-8') as f:
+                self.maps_places.update(json.load(f))
+
+class StubServer:
+    """
+    Serves Fixtures on 127.0.0.1 from a background thread.
+
+    latency (seconds) is added to every response, to model a network
+    round trip, and a random error_rate share of requests is answered with
+    error_status instead. With website_urls, the business websites linked
+    from the Yellow Pages listings are spread over those servers' /site/<n>
+    (any StubServer serves them), so validating them stays local too. Use
+    as a context manager, or call start() and stop().
+    """
+
+    def __init__(self, fixtures: Fixtures = None, latency: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, website_urls: List[str] = None, port: int = 0):
+        self.fixtures = fixtures or Fixtures()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+        self.yellowpages_pages = self.fixtures.yellowpages_pages
+        if website_urls:
+            self.yellowpages_pages = self._local_websites(self.yellowpages_pages, website_urls)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _local_websites(self, pages: List[bytes], website_urls: List[str]) -> List[bytes]:
+        sites = {}
+
+        def local(match):
+            site = sites.setdefault(match.group(2), len(sites))
+            url = f'{website_urls[site % len(website_urls)]}/site/{site}'
+            return match.group(1) + url.encode('utf-8') + match.group(3)
+
+        return [WEBSITE_LINK.sub(local, page) for page in pages]
+
+    def respond(self, path: str, query: dict):
+        """(status, content type, body) for one request."""
+        fixtures = self.fixtures
+
+        if path == '/v3/businesses/search':
+            offset = int(query.get('offset', ['0'])[0])
+            body = fixtures.yelp_pages.get(offset)
+            if body is None:
+                body = json.dumps({'businesses': [], 'total': fixtures.yelp_total}).encode('utf-8')
+            return 200, 'application/json', body
+
+        if path == '/search':
+            page = int(query.get('page', ['1'])[0])
+            if page <= len(self.yellowpages_pages):
+                return 200, 'text/html; charset=utf-8', self.yellowpages_pages[page - 1]
+            return 200, 'text/html; charset=utf-8', EMPTY_YELLOWPAGES_PAGE.encode('utf-8')
+
+        if path.startswith('/maps/search/'):
+            return 200, 'text/html; charset=utf-8', fixtures.maps_results
+
+        if path.startswith('/maps/place/'):
+            place = fixtures.maps_places.get(unquote(path[len('/maps/place/'):]))
+            if not place:
+                return 404, 'text/html', b'<html><body><h1>Not found</h1></body></html>'
+            link = (f'<a data-value="Website" aria-label="Website: {html.escape(place["website"])}" '
+                    f'href="{html.escape(place["website"])}">Website</a>') if place['website'] else ''
+            body = f'<!DOCTYPE html><html><body><h1>{html.escape(place["name"])}</h1>{link}</body></html>'
+            return 200, 'text/html; charset=utf-8', body.encode('utf-8')
+
+        match = re.match(r'/site/(\d+)$', path)
+        if match:
+            return (404 if int(match.group(1)) % 4 == 3 else 200), 'text/html', b'<html><body>Welcome</body></html>'
+
+        return 404, 'text/plain', b'Not found'
+
+def _handler(stub: StubServer):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so clients reuse pooled connections like they do against the real sites
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; don't let Nagle hold the body back
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self._serve(send_body=True)
+
+        def do_HEAD(self):
+            self._serve(send_body=False)
+
+        def _serve(self, send_body: bool):
+            failed = stub.error_rate and random.random() < stub.error_rate
+            with stub._lock:
+                stub.requests += 1
+                stub.errors += bool(failed)
+            if stub.latency:
+                time.sleep(stub.latency)
+
+            if failed:
+                status, content_type, body = stub.error_status, 'text/plain', b'Injected error'
+            else:
+                parsed = urlparse(self.path)
+                status, content_type, body = stub.respond(parsed.path, parse_qs(parsed.query))
+
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client timed out or gave up while we were sleeping off the latency
+                self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
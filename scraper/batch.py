@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Tuple
+from .multi_source import MultiSourceSearcher, source_status
+from .quota import request_priority
+
+# Searches each source may run at the same time, across all batches
+DEFAULT_CONCURRENCY = {
+    'yelp': 4,
+    'yellowpages': 2,
+    'google_maps': 2,
+}
+
+class BatchScheduler:
+    """
+    Runs a location x category x source matrix of searches.
+
+    Every source has its own worker pool sized by its concurrency limit, so
+    each source is kept as busy as it allows and a slow source doesn't hold
+    up the others. The pools are shared by all batches, so the limits hold
+    however many batches run at once. Results are grouped back per
+    (location, category) cell and merged once all of the cell's sources
+    have finished.
+    """
+
+    def __init__(self, searcher: MultiSourceSearcher, concurrency: Dict[str, int] = None):
+        self.searcher = searcher
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.executors = {
+            name: ThreadPoolExecutor(max_workers=self.concurrency.get(name, 2))
+            for name in searcher.sources
+        }
+
+    @staticmethod
+    def expand(locations: List[str], categories: List[str], names: List[str]) -> List[Tuple[str, str, str]]:
+        # Cell by cell, so every source works through the cells in the same order
+        return [(location, category, name) for location in locations for category in categories for name in names]
+
+    def run(self, locations: List[str], radius: int, categories: List[str], names: List[str] = None,
+            on_task: Callable[[str, Dict], None] = None) -> Iterator[Dict]:
+        """
+        Yield one dict per cell (location, category, businesses, sources) as its searches complete.
+
+        on_task(source, status) is called after every single search, from the
+        caller's thread, for progress reporting.
+        """
+        names = [name for name in (names or self.searcher.sources) if name in self.searcher.sources]
+        tasks = self.expand(locations, categories, names)
+
+        futures = {}
+        for location, category, name in tasks:
+            future = self.executors[name].submit(self._run_task, name, location, radius, category)
+            futures[future] = (location, category, name)
+        cells = {}
+
+        try:
+            for future in as_completed(futures):
+                location, category, name = futures[future]
+                try:
+                    businesses, elapsed = future.result()
+                    status = source_status(businesses, elapsed)
+                except Exception as e:
+                    businesses, status = [], {'status': 'error', 'count': 0, 'error': str(e)}
+
+                if on_task:
+                    on_task(name, status)
+
+                cell = cells.setdefault((location, category), {})
+                cell[name] = (businesses, status)
+                if len(cell) < len(names):
+                    continue
+
+                del cells[(location, category)]
+                yield self._merge_cell(location, category, names, cell)
+        finally:
+            # The caller stopped early; drop the searches that haven't started
+            for future in futures:
+                future.cancel()
+
+    def _run_task(self, name: str, location: str, radius: int, category: str):
+        # Batch work yields metered API quota to interactive searches
+        with request_priority('low'):
+            return self.searcher._run_source(name, location, radius, category)
+
+    def _merge_cell(self, location: str, category: str, names: List[str], cell: Dict) -> Dict:
+        businesses = []
+        for name in names:
+            businesses.extend(cell[name][0])
+
+        if self.searcher.deduplicator:
+            businesses = self.searcher.deduplicator.deduplicate(businesses)
+
+        return {
+            'location': location,
+            'category': category,
+            'businesses': businesses,
+            'sources': {name: cell[name][1] for name in names}
+        }
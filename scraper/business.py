@@ -0,0 +1,135 @@
+import sys
+from dataclasses import dataclass, fields
+from typing import Dict, Optional, Tuple
+
+def _intern(value: str) -> str:
+    # Categories, sources and search labels repeat across thousands of records
+    return sys.intern(value) if value else ''
+
+@dataclass(slots=True)
+class Business:
+    """
+    One business listing, as emitted by every searcher.
+
+    Flat and normalized: the address and categories are single strings,
+    a missing phone is '' and a missing rating is None. Display values
+    ('N/A' and so on) are only produced by to_dict(), at the edge.
+    """
+    name: str
+    phone: str = ''
+    address: str = ''
+    categories: str = ''
+    rating: Optional[float] = None
+    review_count: int = 0
+    # Website candidate (or listing page) found by the searcher
+    url: str = ''
+    # Set once the url has been validated
+    has_website: Optional[bool] = None
+    source: str = ''
+    # Every source that found the business, after deduplication
+    sources: Tuple[str, ...] = ()
+    # Source of each merged field, only for records merged from several sources
+    provenance: Optional[Dict[str, str]] = None
+    # Yelp id and coordinates, used to tile and dedupe metro searches
+    id: str = ''
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    # The search (location, category) that found it, for batch sweeps and stored leads
+    query_location: str = ''
+    query_category: str = ''
+    # Made-up placeholder data (no Yelp API key, demo scrapers), never saved as a lead
+    mock: bool = False
+
+    def __post_init__(self):
+        self.categories = _intern(self.categories)
+        self.source = _intern(self.source)
+        self.query_location = _intern(self.query_location)
+        self.query_category = _intern(self.query_category)
+
+    @classmethod
+    def from_listing(cls, data: Dict, source: str = '') -> 'Business':
+        """Build from a Yelp-style nested dict (location.display_address, categories[].title)."""
+        display_address = (data.get('location') or {}).get('display_address') or []
+        coordinates = data.get('coordinates') or {}
+        phone = data.get('display_phone') or ''
+
+        return cls(
+            name=data.get('name') or '',
+            phone='' if phone == 'N/A' else phone,
+            address=', '.join(part for part in display_address if part),
+            categories=', '.join(c['title'] for c in data.get('categories') or [] if c.get('title')),
+            rating=_rating(data.get('rating')),
+            review_count=int(data.get('review_count') or 0),
+            url=data.get('url') or '',
+            source=source,
+            id=data.get('id') or '',
+            latitude=coordinates.get('latitude'),
+            longitude=coordinates.get('longitude')
+        )
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'Business':
+        """Inverse of to_dict, for records posted back by clients."""
+        phone = data.get('phone') or ''
+        has_website = data.get('has_website')
+
+        return cls(
+            name=data.get('name') or '',
+            phone='' if phone == 'N/A' else phone,
+            address=data.get('address') or '',
+            categories=data.get('categories') or '',
+            rating=_rating(data.get('rating')),
+            review_count=int(data.get('review_count') or 0),
+            url=data.get('website_url') or '',
+            has_website=None if has_website is None else bool(has_website),
+            sources=tuple(_intern(source) for source in data.get('sources') or ()),
+            provenance=data.get('provenance') or None,
+            query_location=data.get('location') or '',
+            query_category=data.get('category') or '',
+            mock=bool(data.get('mock'))
+        )
+
+    def to_dict(self) -> Dict:
+        """The JSON shape served by /search, /jobs and /leads."""
+        data = {
+            'name': self.name,
+            'phone': self.phone or 'N/A',
+            'address': self.address,
+            'categories': self.categories,
+            'rating': 'N/A' if self.rating is None else self.rating,
+            'review_count': self.review_count,
+            'has_website': self.has_website,
+            'website_url': self.url
+        }
+        if self.sources:
+            data['sources'] = list(self.sources)
+        if self.provenance:
+            data['provenance'] = dict(self.provenance)
+        if self.query_location:
+            data['location'] = self.query_location
+            data['category'] = self.query_category
+        if self.mock:
+            data['mock'] = True
+        return data
+
+    def to_record(self) -> Dict:
+        """Every non-default field, for storage (see from_record)."""
+        record = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value != field.default:
+                record[field.name] = value
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict) -> 'Business':
+        record = dict(record)
+        if 'sources' in record:
+            record['sources'] = tuple(_intern(source) for source in record['sources'])
+        return cls(**record)
+
+def _rating(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,171 @@
+import re
+from dataclasses import fields
+from functools import lru_cache
+from operator import attrgetter
+from typing import List, Optional
+from .business import Business
+
+# Words that don't distinguish one business name from another
+NAME_STOPWORDS = {'the', 'and', 'of', 'llc', 'inc', 'co', 'corp', 'company', 'ltd'}
+
+STREET_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'road': 'rd', 'boulevard': 'blvd', 'drive': 'dr',
+    'lane': 'ln', 'court': 'ct', 'place': 'pl', 'highway': 'hwy', 'parkway': 'pkwy',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+}
+
+# Fields copied onto the merged record, first non-empty value wins
+MERGE_FIELDS = ['name', 'url', 'phone', 'address', 'categories', 'rating', 'review_count', 'id', 'latitude', 'longitude']
+
+# Directory listing pages, not the business's own website; any real website found by another source wins
+LISTING_HOSTS = ('yelp.com', 'yellowpages.com', 'google.com/maps')
+
+# Read a record's fields as one tuple in declaration (constructor) order, and each field's position in it
+FIELD_NAMES = [field.name for field in fields(Business)]
+_all_values = attrgetter(*FIELD_NAMES)
+MERGE_SLOTS = [(field, FIELD_NAMES.index(field)) for field in MERGE_FIELDS]
+URL_SLOT, SOURCE_SLOT, SOURCES_SLOT, PROVENANCE_SLOT, MOCK_SLOT = (
+    FIELD_NAMES.index(field) for field in ('url', 'source', 'sources', 'provenance', 'mock'))
+
+DIGITS = re.compile(r'\d+')
+WORD = re.compile(r'[a-z0-9]+')
+# Whole words of a lowercased name, skipping the stopwords in the same scan
+NAME_WORD = re.compile(r'(?<![a-z0-9])(?!(?:%s)(?![a-z0-9]))[a-z0-9]+' % '|'.join(sorted(NAME_STOPWORDS)))
+# Street number and the rest of the street line, up to the city or a unit designator
+STREET_NUMBER = re.compile(r'\s*(\d+)\s+((?:(?!\s(?:suite|ste|unit|apt|#)\b)[^,])+)')
+LISTING_URL = re.compile('|'.join(map(re.escape, LISTING_HOSTS)), re.IGNORECASE)
+
+@lru_cache(maxsize=4096)
+def _street_words(street: str) -> str:
+    """Street name with types and directions abbreviated; a city's few street names repeat across records."""
+    return ' '.join([STREET_ABBREVIATIONS.get(word, word) for word in WORD.findall(street)])
+
+class BusinessDeduplicator:
+    """
+    Merges records for the same business coming from different sources.
+
+    Each record gets a few blocking keys (normalized phone digits, and the
+    name token set combined with street number and street). Records sharing
+    any key are joined through a hash index and union-find, so the cost is
+    linear in the number of records rather than pairwise.
+    """
+
+    def deduplicate(self, businesses: List[Business]) -> List[Business]:
+        parent = list(range(len(businesses)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        index = {}
+        blocking_keys = self.blocking_keys
+        for i, business in enumerate(businesses):
+            for key in blocking_keys(business):
+                j = index.setdefault(key, i)
+                if j != i:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j:
+                        # Keep the earliest record as the root so input order decides field priority
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        # Roots are the lowest index in their group, so each group's list exists before its later members
+        groups = {}
+        for i, business in enumerate(businesses):
+            root = find(i)
+            if root == i:
+                groups[i] = [business]
+            else:
+                groups[root].append(business)
+
+        merge = self.merge
+        return [merge(group) if len(group) > 1 else group[0] for group in groups.values()]
+
+    def blocking_keys(self, business: Business) -> List[tuple]:
+        keys = []
+
+        phone = self.normalize_phone(business.phone)
+        if phone:
+            keys.append(('phone', phone))
+
+        # The token set is hashable as it stands, so it goes into the key without sorting and joining
+        tokens = self.name_tokens(business.name)
+        if tokens:
+            street = self.street_key(business.address)
+            if street:
+                keys.append(('name_street', tokens, street))
+
+        return keys
+
+    @staticmethod
+    def normalize_phone(phone: Optional[str]) -> Optional[str]:
+        digits = ''.join(DIGITS.findall(phone)) if phone else ''
+        if len(digits) == 11 and digits[0] == '1':
+            digits = digits[1:]
+        return digits if len(digits) >= 7 else None
+
+    @staticmethod
+    def name_tokens(name: Optional[str]) -> frozenset:
+        return frozenset(NAME_WORD.findall((name or '').lower().replace("'", '')))
+
+    @staticmethod
+    def street_key(address: Optional[str]) -> Optional[str]:
+        if not address:
+            return None
+
+        match = STREET_NUMBER.match(address.lower())
+        if not match:
+            return None
+
+        number, street = match.groups()
+        return f"{number} {_street_words(street)}"
+
+    def merge(self, group: List[Business]) -> Business:
+        """One record for a group of duplicates, ordered from highest to lowest priority."""
+        first = group[0]
+
+        if len(group) == 1:
+            # Every field of a lone record comes from its own source, so it is returned unchanged
+            return first
+
+        sources = []
+        for business in group:
+            for name in business.sources or (business.source or 'unknown',):
+                if name not in sources:
+                    sources.append(name)
+
+        # Start from the first record and take each field from the highest-priority record that has it
+        values = list(_all_values(first))
+        provenance = {}
+        listing = None
+
+        for field, slot in MERGE_SLOTS:
+            for business in group:
+                value = getattr(business, field)
+                # None, '' and 0 count as missing
+                if not value:
+                    continue
+                source = business.source or 'unknown'
+                origin = business.provenance.get(field, source) if business.provenance else source
+                if field == 'url' and LISTING_URL.search(value):
+                    listing = listing or (value, origin)
+                    continue
+                values[slot] = value
+                provenance[field] = origin
+                break
+
+        if 'url' not in provenance and listing:
+            # No source had a real website; keep the listing page
+            values[URL_SLOT], provenance['url'] = listing
+
+        values[SOURCE_SLOT] = sources[0]
+        values[SOURCES_SLOT] = tuple(sources)
+        values[PROVENANCE_SLOT] = provenance
+        values[MOCK_SLOT] = all(business.mock for business in group)
+        # Positional construction; keyword arguments or dataclasses.replace cost several times more per business
+        return Business(*values)
+
+    @staticmethod
+    def is_listing_url(url: str) -> bool:
+        return LISTING_URL.search(url) is not None
@@ -0,0 +1,199 @@
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def chromedriver_path() -> str:
+    """Resolve (and download if needed) the chromedriver binary once per process."""
+    global _driver_path
+
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+def resolve_chromedriver_in_background():
+    """
+    Resolve chromedriver_path() on a background thread, so the first Selenium search doesn't pay for it.
+
+    It may download the driver, so only the app's entry point calls this,
+    not importing code. Otherwise the first pool checkout resolves it.
+    """
+    def resolve():
+        try:
+            chromedriver_path()
+        except Exception as e:
+            logger.warning("Could not resolve chromedriver: %s", e)
+
+    threading.Thread(target=resolve, daemon=True).start()
+
+class DriverPool:
+    """
+    Size-bounded pool of warm Chrome drivers.
+
+    checkout() hands out an idle driver (launching one if the pool is not
+    full yet) and checkin() resets it for the next user. Drivers that fail a
+    health check, crash, or reach max_uses are quit and replaced.
+    """
+
+    def __init__(self, options_factory: Callable[[], Options], size: int = None, max_uses: int = 20,
+                 on_create: Callable = None, implicit_wait: float = 3):
+        self.options_factory = options_factory
+        self.size = size or int(os.environ.get('CHROME_POOL_SIZE', 2))
+        self.max_uses = max_uses
+        self.on_create = on_create
+        self.implicit_wait = implicit_wait
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._uses = {}
+        self._lock = threading.Lock()
+
+    def checkout(self, timeout: float = None):
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError('No Chrome driver became available')
+
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._create()
+
+                if self._healthy(driver):
+                    return driver
+                self._discard(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, driver, broken: bool = False):
+        try:
+            with self._lock:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+                worn_out = self._uses[id(driver)] >= self.max_uses
+
+            if broken or worn_out or not self._reset(driver):
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout: float = None):
+        driver = self.checkout(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.checkin(driver, broken)
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def _create(self):
+        service = Service(chromedriver_path())
+        driver = webdriver.Chrome(service=service, options=self.options_factory())
+        driver.implicitly_wait(self.implicit_wait)
+        if self.on_create:
+            self.on_create(driver)
+        return driver
+
+    def _healthy(self, driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, driver) -> bool:
+        # Leave one blank tab with no cookies so the next search starts clean
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            try:
+                # Clears cookies for every domain, not just the current page's
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            except Exception:
+                driver.delete_all_cookies()
+            driver.get('about:blank')
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+class PooledDriverMixin:
+    """
+    A thread-local `driver` checked out of a DriverPool shared by every instance of the class.
+
+    Classes using it define _chrome_options() (and optionally
+    _on_driver_created) and call _use_pool() from __init__.
+    """
+
+    _shared_pool = None
+    _shared_pool_lock = threading.Lock()
+    # Called with each new driver the pool launches; None for no setup
+    _on_driver_created = None
+
+    def _use_pool(self, pool: DriverPool = None):
+        self.pool = pool or self._get_shared_pool()
+        # Each search thread holds its own checked-out driver
+        self._local = threading.local()
+
+    @property
+    def driver(self):
+        return getattr(self._local, 'driver', None)
+
+    @driver.setter
+    def driver(self, driver):
+        self._local.driver = driver
+
+    @classmethod
+    def _get_shared_pool(cls) -> DriverPool:
+        with cls._shared_pool_lock:
+            # Looked up on cls itself, so each scraper class gets its own pool
+            if cls.__dict__.get('_shared_pool') is None:
+                cls._shared_pool = DriverPool(cls._chrome_options, on_create=cls._on_driver_created)
+            return cls._shared_pool
+
+    @staticmethod
+    def _chrome_options() -> Options:
+        raise NotImplementedError
+
+    def _setup_driver(self):
+        self.driver = self.pool.checkout()
+
+    def _close_driver(self, broken: bool = False):
+        if self.driver:
+            self.pool.checkin(self.driver, broken)
+            self.driver = None
@@ -1,39 +1,139 @@
 import csv
+import io
 import os
-from typing import List, Dict
+import time
+from typing import Iterator, List, Dict
 from datetime import datetime
+import pandas as pd
+from .business import Business
+from .metrics import observe, timed
+
+try:
+    import pyarrow
+    import pyarrow.feather
+except ImportError:
+    pyarrow = None
 
 class CSVExporter:
+    fieldnames = ['name', 'phone', 'address', 'categories', 'rating', 'review_count', 'has_website', 'website_url', 'lead_priority',
+                  'sources', 'provenance']
+    
     def __init__(self):
+        # Created by export() on first use; iter_csv() never touches the disk
         self.export_dir = 'exports'
-        if not os.path.exists(self.export_dir):
-            os.makedirs(self.export_dir)
     
-    def export(self, businesses: List[Dict]) -> str:
+    def export(self, businesses: List[Business]) -> str:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = os.path.join(self.export_dir, f'businesses_{timestamp}.csv')
         
         if not businesses:
             return None
         
-        fieldnames = ['name', 'phone', 'address', 'categories', 'rating', 'review_count', 'has_website', 'website_url', 'lead_priority']
+        os.makedirs(self.export_dir, exist_ok=True)
         
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        with timed('export', 'csv') as timer, open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames, extrasaction='ignore')
             writer.writeheader()
             
             for business in businesses:
-                has_website = business.get('has_website', True)
-                writer.writerow({
-                    'name': business.get('name', ''),
-                    'phone': business.get('phone', ''),
-                    'address': business.get('address', ''),
-                    'categories': business.get('categories', ''),
-                    'rating': business.get('rating', ''),
-                    'review_count': business.get('review_count', 0),
-                    'has_website': 'Yes' if has_website else 'No',
-                    'website_url': business.get('website_url', ''),
-                    'lead_priority': 'HIGH' if not has_website else 'LOW'
-                })
-        
-        return filename
\ No newline at end of file
+                writer.writerow(self._row(business))
+            timer.records = len(businesses)
+        
+        return filename
+    
+    def iter_csv(self, businesses: List[Business]) -> Iterator[str]:
+        """Yield the CSV a row at a time, for streaming responses without a temp file."""
+        # Only our own work is timed, not the time the response spends sending each row
+        spent = 0.0
+        started = time.perf_counter()
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        
+        for business in businesses:
+            writer.writerow(self._row(business))
+            spent += time.perf_counter() - started
+            yield buffer.getvalue()
+            started = time.perf_counter()
+            buffer.seek(0)
+            buffer.truncate()
+        
+        # Header only, when there were no rows
+        if buffer.getvalue():
+            yield buffer.getvalue()
+        observe('export', spent + time.perf_counter() - started, 'csv', len(businesses))
+    
+    def _row(self, business: Business) -> Dict:
+        # Unvalidated records count as having a website, so they aren't flagged as leads
+        has_website = business.has_website is not False
+        return {
+            **business.to_dict(),
+            'has_website': 'Yes' if has_website else 'No',
+            'lead_priority': 'HIGH' if not has_website else 'LOW',
+            'sources': format_sources(business),
+            'provenance': format_provenance(business)
+        }
+
+def format_sources(business: Business) -> str:
+    """Sources as one CSV cell, e.g. 'yelp;yellowpages'."""
+    return ';'.join(business.sources) if business.sources else business.source
+
+def format_provenance(business: Business) -> str:
+    """Field sources of a merged record as one CSV cell, e.g. 'phone=yelp;url=yellowpages'."""
+    if not business.provenance:
+        return ''
+    return ';'.join(f'{field}={source}' for field, source in sorted(business.provenance.items()))
+
+class FrameExporter:
+    """
+    Writes results as one typed pandas DataFrame in a columnar or compressed format.
+
+    Columns match CSVExporter, but rating and review_count are numeric and
+    has_website is boolean, so consumers can load them without re-parsing.
+    """
+    
+    # format -> (mimetype, file extension)
+    formats = {
+        'parquet': ('application/vnd.apache.parquet', 'parquet'),
+        'arrow': ('application/vnd.apache.arrow.file', 'arrow'),
+        'csv.gz': ('application/gzip', 'csv.gz'),
+    }
+    
+    def to_frame(self, businesses: List[Business]) -> pd.DataFrame:
+        has_website = [b.has_website is not False for b in businesses]
+        
+        frame = pd.DataFrame({
+            'name': [b.name for b in businesses],
+            'phone': [b.phone for b in businesses],
+            'address': [b.address for b in businesses],
+            'categories': [b.categories for b in businesses],
+            'rating': pd.Series([b.rating for b in businesses], dtype='float64'),
+            'review_count': pd.Series([b.review_count for b in businesses], dtype='int64'),
+            'has_website': has_website,
+            'website_url': [b.url for b in businesses],
+            'lead_priority': pd.Categorical(['LOW' if h else 'HIGH' for h in has_website], categories=['HIGH', 'LOW']),
+            'sources': [format_sources(b) for b in businesses],
+            'provenance': [format_provenance(b) for b in businesses]
+        })
+        return frame
+    
+    def export_bytes(self, businesses: List[Business], fmt: str) -> bytes:
+        if fmt not in self.formats:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if fmt in ('parquet', 'arrow') and pyarrow is None:
+            raise RuntimeError(f"pyarrow is required for {fmt} exports")
+        
+        with timed('export', fmt) as timer:
+            frame = self.to_frame(businesses)
+            buffer = io.BytesIO()
+            
+            if fmt == 'parquet':
+                frame.to_parquet(buffer, index=False, compression='zstd')
+            elif fmt == 'arrow':
+                # Feather v2 is the Arrow IPC file format
+                pyarrow.feather.write_feather(frame, buffer, compression='zstd')
+            else:
+                frame.to_csv(buffer, index=False, compression='gzip')
+            timer.records = len(businesses)
+        
+        return buffer.getvalue()
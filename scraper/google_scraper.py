@@ -1,21 +1,39 @@
-import time
+import logging
+import os
 import re
 from typing import List, Dict
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from bs4 import BeautifulSoup
+from .business import Business
+from .driver_pool import DriverPool, PooledDriverMixin
+from .maps_dom import card_spec, collect_place_websites, extract_cards, read_card, scroll_feed, wait_for_details, website_from_links
+from .metrics import timed
 
-class GoogleMapsSearcher:
-    def __init__(self):
-        self.driver = None
-        
-    def _setup_driver(self):
+logger = logging.getLogger(__name__)
+
+CARD_SPEC = card_spec(
+    name=['.fontHeadlineSmall'],
+    info='.W4Efsd span',
+    rating=['.MW4etd'],
+    reviews=['.UY7F9']
+)
+
+class GoogleMapsSearcher(PooledDriverMixin):
+    def __init__(self, pool: DriverPool = None, bulk_extract: bool = True, parallel_details: bool = True,
+                 detail_parallelism: int = 8):
+        self.base_url = os.environ.get('GOOGLE_MAPS_SEARCH_URL', 'https://www.google.com/maps/search/')
+        self._use_pool(pool)
+        self.bulk_extract = bulk_extract
+        # Open place pages in parallel tabs for website detection instead of clicking each card
+        self.parallel_details = parallel_details
+        self.detail_parallelism = detail_parallelism
+    
+    @staticmethod
+    def _chrome_options() -> Options:
         chrome_options = Options()
         chrome_options.add_argument('--headless')
         chrome_options.add_argument('--no-sandbox')
@@ -24,66 +42,90 @@ class GoogleMapsSearcher:
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.implicitly_wait(3)
-    
-    def _close_driver(self):
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        return chrome_options
     
-    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Dict]:
+    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Business]:
         businesses = []
+        # (business, place URL) pairs whose website is looked up after the scrape
+        pending_details = []
+        crashed = False
         
         try:
             self._setup_driver()
             
             # Build search query
             search_query = f"{category} near {location}"
-            url = f"https://www.google.com/maps/search/{search_query.replace(' ', '+')}"
+            url = f"{self.base_url}{search_query.replace(' ', '+')}"
             
-            self.driver.get(url)
-            time.sleep(3)
-            
-            # Wait for results to load
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[role="article"]'))
-                )
-            except TimeoutException:
-                print("No results found or timeout")
-                return businesses
-            
-            # Scroll to load more results
-            results_panel = self.driver.find_element(By.CSS_SELECTOR, '[role="feed"]')
-            for _ in range(3):
-                self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", results_panel)
-                time.sleep(2)
+            with timed('page_load', 'google_maps'):
+                self.driver.get(url)
+                
+                # Wait for results to load
+                try:
+                    WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, '[role="article"]'))
+                    )
+                except TimeoutException:
+                    logger.info("No results found or timeout")
+                    return businesses
             
-            # Get all business cards
-            business_elements = self.driver.find_elements(By.CSS_SELECTOR, '[role="article"]')
+            # Scroll to load more results, stopping once the feed stops growing
+            with timed('scroll', 'google_maps'):
+                results_panel = self.driver.find_element(By.CSS_SELECTOR, '[role="feed"]')
+                scroll_feed(self.driver, results_panel, '[role="article"]', target=50, max_rounds=3)
             
-            for element in business_elements[:50]:  # Limit to 50 results
-                try:
-                    business_data = self._extract_business_info(element)
-                    if business_data:
-                        businesses.append(business_data)
-                except Exception as e:
-                    continue
+            with timed('extraction', 'google_maps') as timer:
+                # Get all business cards
+                business_elements = self.driver.find_elements(By.CSS_SELECTOR, '[role="article"]')[:50]  # Limit to 50 results
+                
+                # Read every card's fields in one script call instead of a round trip per selector
+                cards = [None] * len(business_elements)
+                if self.bulk_extract:
+                    cards = extract_cards(self.driver, '[role="article"]', CARD_SPEC, len(business_elements))
+                
+                for element, card in zip(business_elements, cards):
+                    try:
+                        card = card or read_card(element, CARD_SPEC)
+                        business_data = self._extract_business_info(element, card, click_for_website=not self.parallel_details)
+                        if business_data:
+                            businesses.append(business_data)
+                            if not business_data.url and card['place_url']:
+                                pending_details.append((business_data, card['place_url']))
+                    except Exception as e:
+                        continue
+                timer.records = len(businesses)
                     
         except Exception as e:
-            print(f"Error during search: {e}")
+            logger.warning("Error during Google Maps search: %s", e)
+            crashed = isinstance(e, WebDriverException)
         finally:
-            self._close_driver()
+            # Crashed drivers are recycled instead of going back to the pool
+            self._close_driver(crashed)
+        
+        # Driver is back in the pool, so the detail lookups can use it too
+        if pending_details:
+            with timed('details', 'google_maps') as timer:
+                websites = collect_place_websites(
+                    self.pool,
+                    [(business.name, place_url) for business, place_url in pending_details],
+                    parallelism=self.detail_parallelism
+                )
+                timer.records = sum(1 for website in websites if website)
+            for (business, _), website in zip(pending_details, websites):
+                business.url = website
             
         return businesses
     
-    def _extract_business_info(self, element) -> Dict:
+    def _extract_business_info(self, element, card: Dict = None, click_for_website: bool = True) -> Business:
         try:
+            # Without a pre-extracted card, read the fields element by element
+            if card is None:
+                card = read_card(element, CARD_SPEC)
+            
             # Get business name
-            name = element.find_element(By.CSS_SELECTOR, '.fontHeadlineSmall').text
+            name = card['names'][0]
+            if not name:
+                return None
             
             # Initialize data
             business_data = {
@@ -97,58 +139,50 @@ class GoogleMapsSearcher:
             }
             
             # Try to get address
-            try:
-                info_spans = element.find_elements(By.CSS_SELECTOR, '.W4Efsd span')
-                for span in info_spans:
-                    text = span.text
-                    # Check for phone number pattern
-                    if re.match(r'[\(\)\d\s\-\+]+', text) and len(text) > 7:
-                        business_data['display_phone'] = text
-                    # Check for address (contains numbers and letters)
-                    elif any(char.isdigit() for char in text) and any(char.isalpha() for char in text):
-                        business_data['location']['display_address'] = [text]
-                    # Category detection
-                    elif '·' in text:
-                        parts = text.split('·')
-                        if len(parts) > 1:
-                            business_data['categories'] = [{'title': parts[1].strip()}]
-            except:
-                pass
+            for text in card['info']:
+                # Check for phone number pattern
+                if re.match(r'[\(\)\d\s\-\+]+', text) and len(text) > 7:
+                    business_data['display_phone'] = text
+                # Check for address (contains numbers and letters)
+                elif any(char.isdigit() for char in text) and any(char.isalpha() for char in text):
+                    business_data['location']['display_address'] = [text]
+                # Category detection
+                elif '·' in text:
+                    parts = text.split('·')
+                    if len(parts) > 1:
+                        business_data['categories'] = [{'title': parts[1].strip()}]
             
             # Try to get rating
             try:
-                rating_element = element.find_element(By.CSS_SELECTOR, '.MW4etd')
-                business_data['rating'] = float(rating_element.text)
+                business_data['rating'] = float(card['ratings'][0])
             except:
                 pass
             
             # Try to get review count
             try:
-                review_element = element.find_element(By.CSS_SELECTOR, '.UY7F9')
-                review_text = review_element.text
+                review_text = card['reviews'][0]
                 if '(' in review_text and ')' in review_text:
                     count = review_text.split('(')[1].split(')')[0].replace(',', '')
                     business_data['review_count'] = int(count)
             except:
                 pass
             
+            # Some cards link the website directly, which saves opening the details
+            business_data['url'] = website_from_links(card['links'])
+            if business_data['url'] or not click_for_website:
+                return Business.from_listing(business_data)
+            
             # Try to detect if has website
             try:
-                # Click on the business to get more details
+                # Click on the business and wait for its details panel to show
                 element.click()
-                time.sleep(1)
                 
                 # Look for website button/link
-                website_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-value="Website"], [aria-label*="Website"], a[href*="url?q="]')
-                for web_elem in website_elements:
-                    href = web_elem.get_attribute('href')
-                    if href and 'google.com' not in href and 'maps' not in href:
-                        business_data['url'] = href
-                        break
+                business_data['url'] = website_from_links(wait_for_details(self.driver, name))
             except:
                 pass
                 
-            return business_data
+            return Business.from_listing(business_data)
             
         except Exception as e:
-            return None
\ No newline at end of file
+            return None
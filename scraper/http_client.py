@@ -0,0 +1,201 @@
+import json
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+# Requests per second and burst size allowed per host
+DEFAULT_RATES = {
+    'api.yelp.com': (10, 20),
+    'www.yellowpages.com': (2, 4),
+}
+DEFAULT_RATE = (10, 20)
+
+# Responses worth retrying after a pause
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class DeadlineExceeded(requests.Timeout):
+    """The caller's deadline passed while waiting for a rate limit slot or a retry."""
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, in bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float = None) -> float:
+        """Block until a token is available and return the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise DeadlineExceeded('Deadline passed waiting for rate limit')
+
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds`, e.g. after the host sent Retry-After."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+class HttpClient:
+    """
+    Pooled HTTP client shared by the scrapers and the website validator.
+
+    Every host gets a token bucket (DEFAULT_RATES, else DEFAULT_RATE), so
+    concurrent callers together stay under the rate the site tolerates.
+    Throttled and failed responses are retried with jittered exponential
+    backoff; a Retry-After header overrides the backoff and pauses the whole
+    host, not just the request that got it. Per-host counters are kept for
+    monitoring.
+    """
+
+    def __init__(self, rates: Dict[str, Tuple[float, float]] = None, default_rate: Tuple[float, float] = DEFAULT_RATE,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 30, pool_size: int = 32):
+        self.rates = {**DEFAULT_RATES, **(rates or {})}
+        self.default_rate = default_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._buckets = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request('HEAD', url, **kwargs)
+
+    def request(self, method: str, url: str, deadline: float = None, retries: int = None,
+                retry_errors: bool = True, **kwargs) -> requests.Response:
+        """
+        Send a rate-limited request, retrying throttled and failed attempts.
+
+        deadline is a time.monotonic() value after which no more waiting or
+        retrying happens. With retry_errors off, connection errors and
+        timeouts are raised straight away (only bad statuses are retried).
+        Returns the last response, even if its status is still an error.
+        """
+        host = (urlparse(url).hostname or '').lower()
+        bucket = self._bucket(host)
+        retries = self.max_retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            waited = bucket.acquire(deadline)
+            self._count(host, 'requests', rate_limit_wait=waited)
+
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                self._count(host, 'errors')
+                if not retry_errors or attempt == retries:
+                    raise
+                self._sleep(host, self._backoff(attempt), deadline)
+                continue
+
+            self._count(host, f'status_{response.status_code // 100}xx')
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+
+            if response.status_code == 429:
+                self._count(host, 'throttled')
+
+            retry_after = self._retry_after(response)
+            if retry_after is not None:
+                # Everyone talking to this host waits, not just this request
+                bucket.pause(retry_after)
+
+            delay = self._backoff(attempt) if retry_after is None else retry_after
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return response
+            self._sleep(host, delay, deadline)
+
+        return response
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {host: dict(counters) for host, counters in self._counters.items()}
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                rate, capacity = self.rates.get(host, self.default_rate)
+                self._buckets[host] = TokenBucket(rate, capacity)
+            return self._buckets[host]
+
+    def _count(self, host: str, counter: str, rate_limit_wait: float = 0.0):
+        with self._lock:
+            counters = self._counters.setdefault(host, {'requests': 0, 'errors': 0, 'retries': 0, 'throttled': 0,
+                                                        'rate_limit_wait': 0.0, 'backoff_wait': 0.0})
+            counters[counter] = counters.get(counter, 0) + 1
+            counters['rate_limit_wait'] = round(counters['rate_limit_wait'] + rate_limit_wait, 3)
+
+    def _sleep(self, host: str, delay: float, deadline: float = None):
+        if deadline is not None and time.monotonic() + delay > deadline:
+            raise DeadlineExceeded('Deadline passed before retry')
+
+        with self._lock:
+            counters = self._counters[host]
+            counters['retries'] += 1
+            counters['backoff_wait'] = round(counters['backoff_wait'] + delay, 3)
+        time.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps clients that failed together from retrying together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+
+        return min(max(seconds, 0.0), self.backoff_max)
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+def shared_client() -> HttpClient:
+    """The process-wide client, so rate limits hold across every searcher instance."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            # HTTP_RATE_LIMITS='{"host": [rate, burst]}' adds or overrides per-host limits, e.g. for local stand-ins
+            _shared_client = HttpClient(rates=json.loads(os.environ.get('HTTP_RATE_LIMITS') or '{}'))
+        return _shared_client
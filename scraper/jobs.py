@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+class Job:
+    """A background search whose progress and partial results can be polled."""
+
+    def __init__(self, key: str, params: Dict):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.params = params
+        self.status = 'queued'
+        self.progress = {}
+        self.results = []
+        # Indexes of results replaced after they were added (a later source merged into them)
+        self.updated = set()
+        self.summary = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def update(self, **progress):
+        with self._lock:
+            self.progress.update(progress)
+
+    def add_result(self, result):
+        with self._lock:
+            self.results.append(result)
+
+    def replace_result(self, index: int, result):
+        with self._lock:
+            self.results[index] = result
+            self.updated.add(index)
+
+    def finish(self, summary: Dict = None, error: str = None):
+        with self._lock:
+            self.summary = summary
+            self.error = error
+            self.status = 'failed' if error else 'done'
+            self.finished_at = time.time()
+
+    def to_dict(self, since: int = 0) -> Dict:
+        """
+        Snapshot for polling; results before index `since` are left out.
+
+        Those that were replaced since they were added are listed under
+        'updates' as {'index', 'business'} instead, so pollers can patch them.
+        """
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'params': self.params,
+                'progress': dict(self.progress),
+                'result_count': len(self.results),
+                'results': [_to_json(result) for result in self.results[since:]],
+                'updates': [{'index': index, 'business': _to_json(self.results[index])}
+                            for index in sorted(self.updated) if index < since],
+                'summary': self.summary,
+                'error': self.error,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at
+            }
+
+def _to_json(result):
+    # Results may be kept as compact records and only converted when polled
+    return result.to_dict() if hasattr(result, 'to_dict') else result
+
+class JobManager:
+    """
+    Runs jobs on a bounded worker pool.
+
+    Submitting parameters identical to a queued, running or recently
+    finished job returns that job instead of starting another one, and
+    finished jobs are dropped after `retention` seconds.
+    """
+
+    def __init__(self, max_workers: int = 2, dedupe_window: float = 300, retention: float = 3600):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.dedupe_window = dedupe_window
+        self.retention = retention
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, params: Dict, run: Callable[[Job], Optional[Dict]]) -> Job:
+        """Queue run(job) unless an equivalent job exists; run's return value becomes the summary."""
+        key = json.dumps(params, sort_keys=True)
+
+        with self._lock:
+            self._expire()
+
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing and self._reusable(existing):
+                return existing
+
+            job = Job(key, params)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+
+        self.executor.submit(self._run, job, run)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _run(self, job: Job, run: Callable[[Job], Optional[Dict]]):
+        job.status = 'running'
+        try:
+            job.finish(summary=run(job))
+        except Exception as e:
+            job.finish(error=str(e))
+
+    def _reusable(self, job: Job) -> bool:
+        if job.status in ('queued', 'running'):
+            return True
+        return job.status == 'done' and time.time() - job.finished_at < self.dedupe_window
+
+    def _expire(self):
+        # Caller holds self._lock
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from .business import Business
+from .dedup import BusinessDeduplicator
+
+# Columns compared to decide whether a re-scraped lead changed
+CONTENT_FIELDS = ['name', 'phone', 'address', 'categories', 'rating', 'review_count', 'has_website', 'url',
+                  'sources', 'provenance']
+
+class LeadStore:
+    """
+    Local SQLite database of every lead collected by past searches.
+
+    A lead is one business within one search (city, state, category), keyed
+    by its normalized phone, or by name and street when it has no phone.
+    Upserts compare a hash of the row's content and only write leads that are
+    new or changed, so re-scraping a city touches just the differences.
+    """
+
+    def __init__(self, path: str = os.path.join('cache', 'leads.db'), batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS leads ('
+            'lead_key TEXT NOT NULL, city TEXT NOT NULL, state TEXT NOT NULL, category TEXT NOT NULL, '
+            'name TEXT, phone TEXT, phone_norm TEXT, address TEXT, categories TEXT, rating REAL, '
+            'review_count INTEGER, has_website INTEGER NOT NULL, website_url TEXT, '
+            'content_hash TEXT NOT NULL, first_seen REAL NOT NULL, updated_at REAL NOT NULL, '
+            'sources TEXT, provenance TEXT, '
+            'PRIMARY KEY (lead_key, city, state, category))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_leads_phone ON leads (phone_norm)')
+        # Location index also covers the usual city + category + has_website lookup
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_leads_location ON leads (state, city, category, has_website)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_leads_category ON leads (category)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_leads_has_website ON leads (has_website)')
+        self._conn.commit()
+
+    @staticmethod
+    def lead_key(business: Business) -> Optional[str]:
+        phone = BusinessDeduplicator.normalize_phone(business.phone)
+        if phone:
+            return f'phone:{phone}'
+
+        tokens = BusinessDeduplicator.name_tokens(business.name)
+        if not tokens:
+            return None
+
+        street = BusinessDeduplicator.street_key(business.address)
+        return f"name:{' '.join(sorted(tokens))}|{street or ''}"
+
+    @staticmethod
+    def content_hash(business: Business) -> str:
+        content = [getattr(business, field) for field in CONTENT_FIELDS]
+        return hashlib.sha1(json.dumps(content, default=str, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def upsert(self, businesses: List[Business], city: str, state: str, category: str) -> Dict:
+        """
+        Save validated search results for one search.
+
+        Returns how many leads were inserted, updated and left unchanged.
+        """
+        city, state, category = self._normalize_search(city, state, category)
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+
+        rows = {}
+        for business in businesses:
+            key = self.lead_key(business)
+            if key:
+                # Last occurrence wins when a search returns the same lead twice
+                rows[key] = business
+
+        keys = list(rows)
+        now = time.time()
+
+        with self._lock:
+            for start in range(0, len(keys), self.batch_size):
+                chunk = keys[start:start + self.batch_size]
+                placeholders = ','.join('?' * len(chunk))
+                existing = dict(self._conn.execute(
+                    f'SELECT lead_key, content_hash FROM leads '
+                    f'WHERE city = ? AND state = ? AND category = ? AND lead_key IN ({placeholders})',
+                    [city, state, category] + chunk
+                ).fetchall())
+
+                changed = []
+                for key in chunk:
+                    business = rows[key]
+                    digest = self.content_hash(business)
+                    if existing.get(key) == digest:
+                        stats['unchanged'] += 1
+                        continue
+
+                    stats['updated' if key in existing else 'inserted'] += 1
+                    changed.append(self._row(key, city, state, category, business, digest, now))
+
+                if changed:
+                    # One transaction per batch
+                    with self._conn:
+                        self._conn.executemany(
+                            'INSERT INTO leads (lead_key, city, state, category, name, phone, phone_norm, address, '
+                            'categories, rating, review_count, has_website, website_url, content_hash, first_seen, updated_at, '
+                            'sources, provenance) '
+                            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                            'ON CONFLICT (lead_key, city, state, category) DO UPDATE SET '
+                            'name = excluded.name, phone = excluded.phone, phone_norm = excluded.phone_norm, '
+                            'address = excluded.address, categories = excluded.categories, rating = excluded.rating, '
+                            'review_count = excluded.review_count, has_website = excluded.has_website, '
+                            'website_url = excluded.website_url, content_hash = excluded.content_hash, '
+                            'updated_at = excluded.updated_at, sources = excluded.sources, provenance = excluded.provenance',
+                            changed
+                        )
+
+        return stats
+
+    def query(self, city: str = None, state: str = None, category: str = None, has_website: bool = None,
+              phone: str = None, limit: int = 100, offset: int = 0) -> List[Business]:
+        """Return stored leads matching every given filter, most recently updated first."""
+        clauses = []
+        params = []
+
+        if city:
+            clauses.append('city = ?')
+            params.append(city.strip().lower())
+        if state:
+            clauses.append('state = ?')
+            params.append(state.strip().upper())
+        if category:
+            clauses.append('category = ?')
+            params.append(category.strip().lower())
+        if has_website is not None:
+            clauses.append('has_website = ?')
+            params.append(int(has_website))
+        if phone:
+            clauses.append('phone_norm = ?')
+            params.append(BusinessDeduplicator.normalize_phone(phone))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT name, phone, address, categories, rating, review_count, has_website, website_url, '
+                f'sources, provenance, city, state, category FROM leads {where} '
+                f'ORDER BY updated_at DESC, rowid LIMIT ? OFFSET ?',
+                params + [limit, offset]
+            ).fetchall()
+
+        return [
+            Business(
+                name=name,
+                phone=phone or '',
+                address=address or '',
+                categories=categories or '',
+                rating=rating,
+                review_count=review_count or 0,
+                has_website=bool(has_website),
+                url=website_url or '',
+                sources=tuple(json.loads(sources)) if sources else (),
+                provenance=json.loads(provenance) if provenance else None,
+                query_location=f'{city.title()}, {state}',
+                query_category=category
+            )
+            for (name, phone, address, categories, rating, review_count, has_website, website_url,
+                 sources, provenance, city, state, category) in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM leads').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _normalize_search(city: str, state: str, category: str):
+        return (city or '').strip().lower(), (state or '').strip().upper(), (category or 'all').strip().lower()
+
+    @staticmethod
+    def _row(key, city, state, category, business, digest, now):
+        return (
+            key, city, state, category,
+            business.name,
+            business.phone,
+            BusinessDeduplicator.normalize_phone(business.phone),
+            business.address,
+            business.categories,
+            business.rating,
+            business.review_count,
+            int(bool(business.has_website)),
+            business.url,
+            digest, now, now,
+            json.dumps(list(business.sources)) if business.sources else None,
+            json.dumps(business.provenance, sort_keys=True) if business.provenance else None
+        )
@@ -0,0 +1,194 @@
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+logger = logging.getLogger(__name__)
+
+# Reads every result card in one round trip. For each card it returns the
+# text of the first match of each name/rating/review selector (in order),
+# the text of every info element, candidate website hrefs and the place URL.
+CARD_EXTRACTION_SCRIPT = """
+const [cardSelector, limit, spec] = arguments;
+const text = el => el ? (el.innerText || '').trim() : '';
+
+return Array.from(document.querySelectorAll(cardSelector)).slice(0, limit).map(card => {
+    const first = selector => card.querySelector(selector);
+    const place = first(spec.place);
+
+    return {
+        names: spec.name.map(selector => text(first(selector))),
+        info: Array.from(card.querySelectorAll(spec.info)).map(text),
+        ratings: spec.rating.map(selector => {
+            const el = first(selector);
+            return el ? (text(el) || el.getAttribute('aria-label') || '') : '';
+        }),
+        reviews: spec.reviews.map(selector => text(first(selector))),
+        links: Array.from(card.querySelectorAll(spec.website)).map(a => a.href || ''),
+        place_url: place ? place.href || '' : ''
+    };
+});
+"""
+
+# True once the place panel for the clicked card (name passed as argument) is showing
+DETAILS_READY_SCRIPT = """
+const heading = document.querySelector('h1');
+return !!heading && heading.innerText.trim() === arguments[0].trim();
+"""
+
+WEBSITE_LINK_SELECTOR = '[data-value="Website"], [aria-label*="Website"], a[href*="url?q="]'
+PLACE_LINK_SELECTOR = 'a.hfpxzc, a[href*="/maps/place/"]'
+
+def card_spec(name: List[str], info: str, rating: List[str], reviews: List[str]) -> Dict:
+    return {
+        'name': name,
+        'info': info,
+        'rating': rating,
+        'reviews': reviews,
+        'website': WEBSITE_LINK_SELECTOR,
+        'place': PLACE_LINK_SELECTOR
+    }
+
+def extract_cards(driver, card_selector: str, spec: Dict, limit: int) -> List[Dict]:
+    """Pull the raw fields of up to `limit` cards with a single execute_script call."""
+    return driver.execute_script(CARD_EXTRACTION_SCRIPT, card_selector, limit, spec) or []
+
+def read_card(element, spec: Dict) -> Dict:
+    """
+    Per-element fallback producing the same dict as extract_cards.
+
+    Costs several WebDriver round trips per card; only used when bulk
+    extraction is turned off.
+    """
+    def first(selector):
+        elements = element.find_elements(By.CSS_SELECTOR, selector)
+        return elements[0] if elements else None
+
+    def text(elem):
+        return elem.text.strip() if elem else ''
+
+    ratings = []
+    for selector in spec['rating']:
+        elem = first(selector)
+        ratings.append((text(elem) or elem.get_attribute('aria-label') or '') if elem else '')
+
+    place = first(spec['place'])
+
+    return {
+        'names': [text(first(selector)) for selector in spec['name']],
+        'info': [text(elem) for elem in element.find_elements(By.CSS_SELECTOR, spec['info'])],
+        'ratings': ratings,
+        'reviews': [text(first(selector)) for selector in spec['reviews']],
+        'links': [elem.get_attribute('href') or '' for elem in element.find_elements(By.CSS_SELECTOR, spec['website'])],
+        'place_url': (place.get_attribute('href') or '') if place else ''
+    }
+
+def website_from_links(links: List[str]) -> str:
+    for href in links:
+        if href and 'google.com' not in href and 'maps' not in href:
+            return href
+    return ''
+
+def card_count(driver, card_selector: str) -> int:
+    return driver.execute_script('return document.querySelectorAll(arguments[0]).length', card_selector)
+
+def scroll_feed(driver, panel, card_selector: str, target: int = None, max_rounds: int = 10,
+                settle_timeout: float = 2.5, poll: float = 0.2) -> int:
+    """
+    Scroll the results feed until it stops growing or holds `target` cards.
+
+    After each scroll we poll the card count and move on as soon as it
+    grows; if it doesn't grow within settle_timeout the feed is exhausted.
+    Returns the final card count.
+    """
+    count = card_count(driver, card_selector)
+
+    for _ in range(max_rounds):
+        if target and count >= target:
+            break
+
+        driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', panel)
+        previous = count
+
+        def grown(d):
+            current = card_count(d, card_selector)
+            return current if current > previous else False
+
+        try:
+            count = WebDriverWait(driver, settle_timeout, poll_frequency=poll).until(grown)
+        except TimeoutException:
+            break
+
+    return count
+
+def wait_for_details(driver, name: str, timeout: float = 3) -> List[str]:
+    """
+    Wait for the place panel of `name` to open and return its website link hrefs.
+
+    Replaces a fixed sleep after clicking a card; gives up after `timeout`
+    and returns whatever links are present then.
+    """
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(DETAILS_READY_SCRIPT, name)
+        )
+    except TimeoutException:
+        pass
+
+    return driver.execute_script(
+        'return Array.from(document.querySelectorAll(arguments[0])).map(a => a.href || "")',
+        WEBSITE_LINK_SELECTOR
+    ) or []
+
+def collect_place_websites(pool, places: List[Tuple[str, str]], parallelism: int = 8, tabs_per_driver: int = 4,
+                           timeout: float = 5) -> List[str]:
+    """
+    Look up the website of many places at once.
+
+    `places` holds (name, place_url) pairs. Up to `parallelism` place pages
+    load at the same time: each worker checks a driver out of `pool` and
+    opens its places in batches of background tabs, which the browser loads
+    concurrently. Returns one website href ('' if none) per place.
+    """
+    if not places:
+        return []
+
+    workers = max(1, min(pool.size, math.ceil(parallelism / tabs_per_driver), len(places)))
+    tabs = max(1, math.ceil(parallelism / workers))
+    websites = [''] * len(places)
+
+    def work(indexes):
+        with pool.driver() as driver:
+            main_handle = driver.current_window_handle
+            for start in range(0, len(indexes), tabs):
+                batch = indexes[start:start + tabs]
+
+                # Open the whole batch first so the pages load in parallel
+                handles = []
+                for index in batch:
+                    before = set(driver.window_handles)
+                    driver.execute_script('window.open(arguments[0], "_blank")', places[index][1])
+                    handles.append(next(iter(set(driver.window_handles) - before), None))
+
+                for index, handle in zip(batch, handles):
+                    if not handle:
+                        continue
+                    driver.switch_to.window(handle)
+                    websites[index] = website_from_links(wait_for_details(driver, places[index][0], timeout))
+                    driver.close()
+
+                driver.switch_to.window(main_handle)
+
+    # Deal places round-robin so every worker gets a similar share
+    assignments = [list(range(worker, len(places), workers)) for worker in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(work, indexes) for indexes in assignments]:
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning("Error collecting place websites: %s", e)
+
+    return websites
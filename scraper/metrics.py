@@ -0,0 +1,220 @@
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from a cached lookup up to a full browser scrape
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _label_key(labelnames: Tuple[str, ...], labels: Dict) -> Tuple[str, ...]:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[Tuple[str, Dict, float]]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+class Histogram:
+    """Observations counted into cumulative buckets, plus their sum and count, per label set."""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [count per bucket (last is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts[0][index] += 1
+            counts[1] += value
+
+    def samples(self) -> Iterator[Tuple[str, Dict, float]]:
+        with self._lock:
+            values = {key: (list(buckets), total) for key, (buckets, total) in self._values.items()}
+
+        for key, (buckets, total) in sorted(values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), buckets):
+                cumulative += count
+                yield f'{self.name}_bucket', {**labels, 'le': _format_value(bound)}, cumulative
+            yield f'{self.name}_sum', labels, round(total, 6)
+            yield f'{self.name}_count', labels, cumulative
+
+class Family:
+    """Samples read from elsewhere (client, cache and quota stats) at scrape time; see Registry.add_collector."""
+
+    def __init__(self, name: str, documentation: str, type: str = 'gauge', labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self._samples = []
+
+    def add(self, value: float, **labels):
+        self._samples.append((self.name, {name: labels[name] for name in self.labelnames}, value))
+
+    def samples(self) -> Iterator[Tuple[str, Dict, float]]:
+        return iter(self._samples)
+
+class Registry:
+    """Metrics served at /metrics, in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        """collector() is called on every scrape and returns Family objects with current values."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        for collector in collectors:
+            try:
+                metrics.extend(collector())
+            except Exception as e:
+                # One broken stats source shouldn't take the whole endpoint down
+                logger.warning("Metrics collector failed: %s", e)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'scraper_stage_seconds', 'Time spent in each pipeline stage', ('stage', 'source')
+))
+STAGE_RECORDS = REGISTRY.register(Counter(
+    'scraper_stage_records_total', 'Records produced by each pipeline stage', ('stage', 'source')
+))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    'scraper_stage_errors_total', 'Pipeline stage runs that raised an exception', ('stage', 'source')
+))
+WEBSITE_CHECKS = REGISTRY.register(Counter(
+    'scraper_website_checks_total', 'Live website checks by outcome (valid, invalid, expired)', ('result',)
+))
+
+class StageTimer:
+    """Handed out by timed(); set `records` to count what the stage produced."""
+
+    __slots__ = ('records',)
+
+    def __init__(self):
+        self.records = 0
+
+@contextmanager
+def timed(stage: str, source: str = '') -> Iterator[StageTimer]:
+    """
+    Time a pipeline stage (fetch, page_load, scroll, extraction, details, website_check,
+    validation, serialization, export).
+
+    The duration goes into scraper_stage_seconds, exceptions are counted in
+    scraper_stage_errors_total and re-raised.
+    """
+    timer = StageTimer()
+    started = time.perf_counter()
+    try:
+        yield timer
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage, source=source)
+        raise
+    finally:
+        observe(stage, time.perf_counter() - started, source, timer.records)
+
+def observe(stage: str, seconds: float, source: str = '', records: int = 0):
+    """Record a stage duration measured by the caller, e.g. summed across a generator's steps."""
+    STAGE_SECONDS.observe(seconds, stage=stage, source=source)
+    if records:
+        STAGE_RECORDS.inc(records, stage=stage, source=source)
+    logger.debug("%s[%s] took %.3fs (%d records)", stage, source, seconds, records)
+
+def families(prefix: str, documentation: str, labelnames: Tuple[str, ...],
+             rows: Iterable[Tuple[Dict, Dict[str, float]]], gauges: Iterable[str] = ()) -> List[Family]:
+    """
+    Turn stats dicts into metric families named `<prefix>_<key>`.
+
+    rows are (labels, stats) pairs, e.g. ({'host': host}, client.stats()[host]).
+    Keys listed in gauges become gauges, the rest `_total` counters;
+    non-numeric values are skipped.
+    """
+    gauges = set(gauges)
+    by_name = {}
+    for labels, stats in rows:
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key in gauges:
+                name, type = f'{prefix}_{key}', 'gauge'
+            else:
+                name, type = f'{prefix}_{key}_total', 'counter'
+            if name not in by_name:
+                by_name[name] = Family(name, f'{documentation}: {key}', type, labelnames)
+            by_name[name].add(value, **labels)
+    return list(by_name.values())
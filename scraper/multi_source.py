@@ -0,0 +1,130 @@
+import time
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, List, Tuple
+from .yelp_api import YelpSearcher
+from .yellowpages_scraper import YellowPagesSearcher
+from .google_scraper import GoogleMapsSearcher
+from .business import Business
+from .dedup import BusinessDeduplicator
+from .metrics import timed
+from .quota import PartialResults
+
+# Seconds each source may take before the aggregator stops waiting for it
+DEFAULT_BUDGETS = {
+    'yelp': 10,
+    'yellowpages': 15,
+    'google_maps': 60,
+}
+
+def source_status(businesses: List[Business], elapsed: float) -> Dict:
+    """Status of a source that returned; 'partial' (with the reason) if it stopped early."""
+    status = {'status': 'ok', 'count': len(businesses), 'elapsed': round(elapsed, 2)}
+    if isinstance(businesses, PartialResults):
+        status.update(status='partial', reason=businesses.reason)
+    return status
+
+class MultiSourceSearcher:
+    """
+    Queries several searchers concurrently and returns whatever finished in time.
+
+    Every source runs on its own worker and gets its own time budget,
+    measured from when that worker picks it up. A source that overruns is
+    reported as timed out and its late results are discarded, so a search
+    costs the slowest source's latency capped by the largest budget. The
+    pool has room for concurrent_searches searches at once; a source still
+    queued when its budget runs out is cancelled before it calls upstream.
+    Records for the same business from different sources are merged, with
+    earlier sources taking priority.
+    """
+
+    def __init__(self, sources: Dict = None, budgets: Dict[str, float] = None, dedupe: bool = True,
+                 concurrent_searches: int = 8):
+        if sources is None:
+            sources = {
+                'yelp': YelpSearcher(),
+                'yellowpages': YellowPagesSearcher(),
+                'google_maps': GoogleMapsSearcher(),
+            }
+
+        self.sources = sources
+        self.budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.deduplicator = BusinessDeduplicator() if dedupe else None
+        # Long-lived pool: sources that overrun keep their worker until they return
+        self.executor = ThreadPoolExecutor(max_workers=len(sources) * concurrent_searches)
+
+    def search(self, location: str, radius: int = 5, category: str = 'barbershop', names: List[str] = None) -> Dict:
+        names = [name for name in (names or self.sources) if name in self.sources]
+
+        results = {}
+        statuses = {}
+        for name, businesses, status in self.iter_search(location, radius, category, names):
+            results[name] = businesses
+            statuses[name] = status
+
+        businesses = []
+        for name in names:
+            businesses.extend(results.get(name, []))
+
+        if self.deduplicator:
+            businesses = self.deduplicator.deduplicate(businesses)
+
+        return {'businesses': businesses, 'sources': statuses}
+
+    def iter_search(self, location: str, radius: int = 5, category: str = 'barbershop',
+                    names: List[str] = None) -> Iterator[Tuple[str, List[Business], Dict]]:
+        """Yield (source, businesses, status) for each source as soon as it finishes or runs out of budget."""
+        names = [name for name in (names or self.sources) if name in self.sources]
+        start = time.monotonic()
+        # When each source's worker picked it up; its budget counts from there
+        started = {}
+
+        def run(name):
+            started[name] = time.monotonic()
+            return self._run_source(name, location, radius, category)
+
+        futures = {self.executor.submit(run, name): name for name in names}
+        pending = set(futures)
+
+        def expires_at(future):
+            # Queued sources are measured from submission, so a full pool can't hold the search forever
+            name = futures[future]
+            return started.get(name, start) + self.budgets.get(name, 30)
+
+        while pending:
+            done, _ = wait(pending, timeout=max(min(map(expires_at, pending)) - time.monotonic(), 0),
+                           return_when=FIRST_COMPLETED)
+
+            for future in done:
+                pending.discard(future)
+                name = futures[future]
+                try:
+                    businesses, elapsed = future.result()
+                    yield name, businesses, source_status(businesses, elapsed)
+                except Exception as e:
+                    yield name, [], {'status': 'error', 'count': 0, 'error': str(e),
+                                     'elapsed': round(time.monotonic() - start, 2)}
+
+            now = time.monotonic()
+            for future in [future for future in pending if expires_at(future) <= now and not future.done()]:
+                pending.discard(future)
+                status = {'status': 'timeout', 'count': 0, 'elapsed': round(now - start, 2)}
+                # Only succeeds while still queued, which saves the upstream calls (and quota) it would make
+                if future.cancel():
+                    status['reason'] = 'not started'
+                yield futures[future], [], status
+
+    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Business]:
+        return self.search(location, radius, category)['businesses']
+
+    def _run_source(self, name: str, location: str, radius: int, category: str):
+        started = time.monotonic()
+        with timed('fetch', name) as timer:
+            businesses = self.sources[name].search_businesses(location, radius, category)
+            timer.records = len(businesses)
+
+        # Tag each record with where it came from (copies, so cached results stay untouched)
+        tagged = [replace(business, source=name) for business in businesses]
+        if isinstance(businesses, PartialResults):
+            tagged = PartialResults(tagged, businesses.reason)
+        return tagged, time.monotonic() - started
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Mapping, Optional
+
+class PartialResults(list):
+    """
+    Businesses from a search that stopped early, with the reason it stopped.
+
+    Behaves like the plain list searchers return, so callers that don't care
+    keep working; callers that do check `partial` and `reason`. Partial
+    results are never cached.
+    """
+
+    partial = True
+
+    def __init__(self, businesses: Iterable = (), reason: str = ''):
+        super().__init__(businesses)
+        self.reason = reason
+
+_priority = threading.local()
+
+@contextmanager
+def request_priority(priority: str):
+    """Run API calls in this thread as 'high' (interactive, the default) or 'low' (batch) priority."""
+    previous = current_priority()
+    _priority.value = priority
+    try:
+        yield
+    finally:
+        _priority.value = previous
+
+def current_priority() -> str:
+    return getattr(_priority, 'value', 'high')
+
+class QuotaBudget:
+    """
+    Tracks what is left of a daily API quota and paces its use over the day.
+
+    The estimate is corrected from the API's RateLimit-DailyLimit,
+    RateLimit-Remaining and RateLimit-ResetTime headers and counted down
+    locally in between. High priority calls may use everything that is left.
+    Low priority calls may only spend what has accrued at an even pace since
+    the last reset (plus a small burst), and never the `reserve` share kept
+    for interactive searches, so batch sweeps can't drain the quota by noon.
+    Low priority work over that pace is shed, not queued: the caller gets
+    partial results and has to run the search again later.
+    """
+
+    def __init__(self, daily_limit: int = 5000, reserve: float = 0.1, burst: float = 0.05, period: float = 24 * 3600):
+        self.daily_limit = daily_limit
+        self.reserve = reserve
+        self.burst = burst
+        self.period = period
+        self.remaining = daily_limit
+        self.reset_at = self._next_reset()
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, units: int = 1, priority: str = None) -> int:
+        """Take up to `units` calls from the budget and return how many were granted."""
+        priority = priority or current_priority()
+
+        with self._lock:
+            now = time.time()
+            self._refresh(now)
+
+            available = max(int(self.remaining - self._floor(priority, now)), 0)
+            granted = min(units, available)
+            self.remaining -= granted
+            if granted < units:
+                self.denied += units - granted
+            return granted
+
+    def refund(self, units: int = 1):
+        """Give back units acquired for calls the API never counted, e.g. requests that failed."""
+        with self._lock:
+            self.remaining = min(self.remaining + units, self.daily_limit)
+
+    def update(self, headers: Mapping[str, str]) -> bool:
+        """Resynchronize with the quota reported by the API; True if it reported what is remaining."""
+        limit = _int_header(headers, 'RateLimit-DailyLimit')
+        remaining = _int_header(headers, 'RateLimit-Remaining')
+        reset_time = headers.get('RateLimit-ResetTime')
+
+        with self._lock:
+            if limit is not None:
+                self.daily_limit = limit
+            if remaining is not None:
+                self.remaining = remaining
+            if reset_time:
+                try:
+                    self.reset_at = datetime.fromisoformat(reset_time).timestamp()
+                except ValueError:
+                    pass
+
+        return remaining is not None
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            now = time.time()
+            self._refresh(now)
+            return {
+                'daily_limit': self.daily_limit,
+                'remaining': self.remaining,
+                'available_low_priority': max(int(self.remaining - self._floor('low', now)), 0),
+                'resets_in': round(self.reset_at - now),
+                'denied': self.denied
+            }
+
+    def _floor(self, priority: str, now: float) -> float:
+        # Caller holds self._lock; the part of the quota this priority must leave untouched
+        if priority != 'low':
+            return 0
+
+        unaccrued = min(max(self.reset_at - now, 0) / self.period, 1)
+        shared = self.daily_limit * (1 - self.reserve)
+        return self.daily_limit * self.reserve + shared * unaccrued - self.daily_limit * self.burst
+
+    def _refresh(self, now: float):
+        # Caller holds self._lock
+        if now >= self.reset_at:
+            self.remaining = self.daily_limit
+            self.reset_at = self._next_reset()
+
+    @staticmethod
+    def _next_reset() -> float:
+        # Daily quotas roll over at midnight UTC unless the API says otherwise
+        tomorrow = datetime.now(timezone.utc).date() + timedelta(days=1)
+        return datetime(tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=timezone.utc).timestamp()
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+_budgets = {}
+_budgets_lock = threading.Lock()
+
+def shared_budget(name: str) -> QuotaBudget:
+    """The process-wide budget for one API (e.g. 'yelp'), shared by every searcher instance."""
+    with _budgets_lock:
+        if name not in _budgets:
+            limit = int(os.environ.get(f'{name.upper()}_DAILY_LIMIT', 5000))
+            _budgets[name] = QuotaBudget(daily_limit=limit)
+        return _budgets[name]
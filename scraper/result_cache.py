@@ -0,0 +1,201 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from .business import Business
+from .quota import PartialResults
+
+# Seconds a result set stays fresh, per searcher class name
+DEFAULT_TTLS = {
+    'YelpSearcher': 3600,
+    'TiledYelpSearcher': 3600,
+    'YellowPagesSearcher': 6 * 3600,
+    'GoogleMapsSearcher': 6 * 3600,
+    'WorkingGoogleScraper': 6 * 3600,
+}
+
+def _copy(businesses: List[Business]) -> List[Business]:
+    # Keeps the partial marker for everyone sharing an in-flight result
+    if isinstance(businesses, PartialResults):
+        return PartialResults(businesses, businesses.reason)
+    return list(businesses)
+
+class _Flight:
+    """One upstream call that concurrent identical requests wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class ResultCache:
+    """
+    Two-tier cache for searcher results.
+
+    Results live in an in-memory LRU and, when disk_path is given, in a
+    SQLite table that survives restarts. Concurrent misses for the same key
+    are coalesced so only one caller goes upstream while the rest wait for
+    its result.
+    """
+
+    def __init__(self, max_entries: int = 256, ttls: Dict[str, float] = None,
+                 default_ttl: float = 900, disk_path: str = None):
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._conn.commit()
+        self._disk_lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, self.default_ttl)
+
+    def get_or_fetch(self, source: str, key: Tuple, fetch: Callable[[], List[Business]], ttl: float = None) -> List[Business]:
+        cache_key = json.dumps([source, *key])
+
+        value = self._get(cache_key)
+        if value is not None:
+            return list(value)
+
+        with self._lock:
+            # A leader may have finished between the lookup above and taking the lock
+            entry = self._memory.get(cache_key)
+            if entry and entry[0] > time.time():
+                self.hits += 1
+                return list(entry[1])
+
+            flight = self._inflight.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[cache_key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return _copy(flight.result)
+
+        try:
+            flight.result = fetch()
+            # Empty and partial result sets are usually upstream failures, so don't pin them
+            if flight.result and not isinstance(flight.result, PartialResults):
+                self._set(cache_key, flight.result, ttl or self.ttl_for(source))
+            return _copy(flight.result)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[cache_key]
+            flight.done.set()
+
+    def _get(self, cache_key: str) -> Optional[List[Business]]:
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(cache_key)
+                    self.hits += 1
+                    return value
+                del self._memory[cache_key]
+
+        if not self._conn:
+            return None
+
+        with self._disk_lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM results WHERE key = ? AND expires_at > ?', (cache_key, now)
+            ).fetchone()
+        if not row:
+            return None
+
+        try:
+            value = [Business.from_record(record) for record in json.loads(row[0])]
+        except TypeError:
+            # Written by an older version in a different record format
+            return None
+        with self._lock:
+            self._remember(cache_key, row[1], value)
+            self.disk_hits += 1
+        return value
+
+    def _set(self, cache_key: str, value: List[Business], ttl: float):
+        expires_at = time.time() + ttl
+
+        with self._lock:
+            self._remember(cache_key, expires_at, value)
+
+        if self._conn:
+            with self._disk_lock:
+                with self._conn:
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)',
+                        (cache_key, json.dumps([business.to_record() for business in value]), expires_at)
+                    )
+                    self._conn.execute('DELETE FROM results WHERE expires_at <= ?', (time.time(),))
+
+    def _remember(self, cache_key: str, expires_at: float, value: List[Business]):
+        # Caller holds self._lock
+        self._memory[cache_key] = (expires_at, value)
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'size': len(self._memory)
+            }
+
+class CachedSearcher:
+    """Wraps any searcher so search_businesses goes through a ResultCache."""
+
+    def __init__(self, searcher, cache: ResultCache, source: str = None, ttl: float = None):
+        self.searcher = searcher
+        self.cache = cache
+        self.source = source or type(searcher).__name__
+        self.ttl = ttl
+
+    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Business]:
+        key = (' '.join(location.lower().split()), radius, category.lower().strip())
+
+        return self.cache.get_or_fetch(
+            self.source, key,
+            lambda: self.searcher.search_businesses(location, radius, category),
+            self.ttl
+        )
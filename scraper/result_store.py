@@ -0,0 +1,43 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+from .business import Business
+
+class ResultStore:
+    """
+    Keeps recent processed search results in memory under a result id.
+
+    Lets clients refer to a result set (e.g. for /export/<id>) instead of
+    posting it back. Holds at most max_results sets, each for ttl seconds.
+    """
+
+    def __init__(self, max_results: int = 100, ttl: float = 3600):
+        self.max_results = max_results
+        self.ttl = ttl
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, businesses: List[Business]) -> str:
+        result_id = uuid.uuid4().hex
+
+        with self._lock:
+            self._results[result_id] = (time.time() + self.ttl, businesses)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+        return result_id
+
+    def get(self, result_id: str) -> Optional[List[Business]]:
+        with self._lock:
+            entry = self._results.get(result_id)
+            if not entry:
+                return None
+
+            expires_at, businesses = entry
+            if expires_at < time.time():
+                del self._results[result_id]
+                return None
+
+            return businesses
@@ -1,11 +1,15 @@
+import logging
 import random
-from typing import List, Dict
+from typing import List
+from .business import Business
+
+logger = logging.getLogger(__name__)
 
 class SimpleReliableScraper:
     def __init__(self):
         pass
     
-    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Dict]:
+    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Business]:
         """
         For now, return realistic mock data that will definitely work.
         This ensures the UI works while we can work on real scraping later.
@@ -64,7 +68,7 @@ class SimpleReliableScraper:
         }
         
         # Get business names for the category
-        business_names = templates.get(category.lower().replace(' ', ''), templates['handyman'])
+        business_names = templates.get(' '.join(category.lower().split()), templates['handyman'])
         
         businesses = []
         
@@ -86,23 +90,22 @@ class SimpleReliableScraper:
             # 60% chance of NO website (these are the leads we want!)
             has_website = random.random() < 0.4  # 40% have websites, 60% don't
             
-            business = {
-                'name': f"{name} - {city}",
-                'url': f'https://www.{name.lower().replace(" ", "").replace("\'", "")}.com' if has_website else '',
-                'display_phone': phone,
-                'location': {
-                    'display_address': [address, location]
-                },
-                'categories': [{'title': category.title()}],
-                'rating': rating,
-                'review_count': reviews
-            }
+            business = Business(
+                name=f"{name} - {city}",
+                url=f'https://www.{name.lower().replace(" ", "").replace("\'", "")}.com' if has_website else '',
+                phone=phone,
+                address=f"{address}, {location}",
+                categories=category.title(),
+                rating=rating,
+                review_count=reviews,
+                mock=True
+            )
             
             businesses.append(business)
             
         # Shuffle to make it seem more realistic
         random.shuffle(businesses)
         
-        print(f"Generated {len(businesses)} {category} businesses for {location}")
+        logger.debug("Generated %d %s businesses for %s", len(businesses), category, location)
         
         return businesses[:8]  # Return 8 businesses for speed
\ No newline at end of file
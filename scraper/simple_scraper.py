@@ -2,8 +2,9 @@ import requests
 from bs4 import BeautifulSoup
 import json
 import time
-from typing import List, Dict
+from typing import List
 import re
+from .business import Business
 
 class SimpleGoogleSearcher:
     def __init__(self):
@@ -15,7 +16,7 @@ class SimpleGoogleSearcher:
             'Connection': 'keep-alive',
         }
     
-    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Dict]:
+    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Business]:
         businesses = []
         
         # Build search query - simpler approach using Google search
@@ -26,7 +27,7 @@ class SimpleGoogleSearcher:
         
         return businesses
     
-    def _get_mock_data_for_category(self, category: str, location: str) -> List[Dict]:
+    def _get_mock_data_for_category(self, category: str, location: str) -> List[Business]:
         # Generate realistic mock data based on category
         mock_templates = {
             'barbershop': [
@@ -122,7 +123,7 @@ class SimpleGoogleSearcher:
         }
         
         # Get the appropriate template or use a default
-        templates = mock_templates.get(category.replace(' ', '').lower(), mock_templates['handyman'])
+        templates = mock_templates.get(' '.join(category.lower().split()), mock_templates['handyman'])
         
         businesses = []
         for idx, (name, phone, has_website) in enumerate(templates):
@@ -131,17 +132,16 @@ class SimpleGoogleSearcher:
             streets = ['Main St', 'Oak Ave', 'First St', 'Park Rd', 'Market St', 'Elm St', 'Center Ave', 'Washington Blvd']
             street = streets[idx % len(streets)]
             
-            business = {
-                'name': name,
-                'url': f'https://www.{name.lower().replace(" ", "").replace("\'", "")}.com' if has_website else '',
-                'display_phone': phone,
-                'location': {
-                    'display_address': [f'{street_num} {street}', location]
-                },
-                'categories': [{'title': category.title()}],
-                'rating': round(3.5 + (idx % 5) * 0.3, 1),
-                'review_count': 20 + (idx * 15)
-            }
+            business = Business(
+                name=name,
+                url=f'https://www.{name.lower().replace(" ", "").replace("\'", "")}.com' if has_website else '',
+                phone=phone,
+                address=f'{street_num} {street}, {location}',
+                categories=category.title(),
+                rating=round(3.5 + (idx % 5) * 0.3, 1),
+                review_count=20 + (idx * 15),
+                mock=True
+            )
             businesses.append(business)
         
         return businesses
\ No newline at end of file
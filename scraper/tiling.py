@@ -0,0 +1,164 @@
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple
+from .business import Business
+from .quota import PartialResults, current_priority
+from .yelp_api import YelpSearcher
+
+METERS_PER_MILE = 1609.34
+METERS_PER_DEGREE_LAT = 111320
+# Yelp's largest search radius
+MAX_RADIUS_METERS = 40000
+
+class Tile(NamedTuple):
+    """A lat/long-aligned cell: its center and half its height and width in degrees."""
+    latitude: float
+    longitude: float
+    half_lat: float
+    half_lon: float
+
+    @property
+    def radius(self) -> int:
+        # Smallest search circle that covers the whole cell, measured at its widest (equator-side) edge
+        height = self.half_lat * METERS_PER_DEGREE_LAT
+        widest = math.cos(math.radians(max(abs(self.latitude) - self.half_lat, 0)))
+        width = self.half_lon * METERS_PER_DEGREE_LAT * widest
+        return math.ceil(math.hypot(height, width))
+
+    @property
+    def half_size(self) -> float:
+        # Half the height in meters, which is what subdivision is limited by
+        return self.half_lat * METERS_PER_DEGREE_LAT
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        # Half-open, so a business on a shared edge belongs to exactly one cell
+        return (self.latitude - self.half_lat <= latitude < self.latitude + self.half_lat and
+                self.longitude - self.half_lon <= longitude < self.longitude + self.half_lon)
+
+    def split(self) -> List['Tile']:
+        half_lat, half_lon = self.half_lat / 2, self.half_lon / 2
+        return [
+            Tile(self.latitude + sign_lat * half_lat, self.longitude + sign_lon * half_lon, half_lat, half_lon)
+            for sign_lat in (-1, 1) for sign_lon in (-1, 1)
+        ]
+
+def plan_grid(latitude: float, longitude: float, radius_meters: float,
+              max_half_size: float = MAX_RADIUS_METERS / math.sqrt(2)) -> List[Tile]:
+    """Cover the square of side 2 * radius_meters around a point with the fewest cells Yelp can search."""
+    per_axis = max(1, math.ceil(radius_meters / max_half_size))
+    half_size = radius_meters / per_axis
+    half_lat = half_size / METERS_PER_DEGREE_LAT
+    half_lon = half_size / (METERS_PER_DEGREE_LAT * math.cos(math.radians(latitude)))
+    offset = (per_axis - 1) / 2
+
+    tiles = [
+        Tile(latitude + 2 * (row - offset) * half_lat, longitude + 2 * (col - offset) * half_lon, half_lat, half_lon)
+        for row in range(per_axis) for col in range(per_axis)
+    ]
+    # Cells away from the center are wider in meters; split any a single search can't cover
+    while any(tile.radius > MAX_RADIUS_METERS for tile in tiles):
+        tiles = [child for tile in tiles for child in (tile.split() if tile.radius > MAX_RADIUS_METERS else [tile])]
+    return tiles
+
+class TiledYelpSearcher:
+    """
+    Covers a whole metro area with Yelp searches past its radius and result caps.
+
+    A plain search is tried first. Only if the area is larger than Yelp's
+    40 km radius, or the search matches more businesses than Yelp lets us
+    page through, is the area split into a grid of square cells, searched by
+    latitude/longitude concurrently. Any cell still over the cap is split
+    into quarters and searched again, so the number of requests follows
+    business density rather than area. Each business is kept only by the
+    cell that contains it (and once per Yelp id), which removes the overlap
+    between the cells' search circles.
+    """
+
+    def __init__(self, searcher: YelpSearcher = None, max_workers: int = 4, min_half_size: float = 250,
+                 max_tiles: int = 256):
+        self.searcher = searcher or YelpSearcher()
+        self.max_workers = max_workers
+        # Cells this small are taken as they are, even if still over the cap
+        self.min_half_size = min_half_size
+        # Hard stop on the number of cell searches per metro
+        self.max_tiles = max_tiles
+
+    def search_businesses(self, location: str, radius: int = 5, category: str = 'all') -> List[Business]:
+        if not self.searcher.api_key:
+            return self.searcher.search_businesses(location, radius, category)
+
+        priority = current_priority()
+        radius_meters = radius * METERS_PER_MILE
+        filters = {'categories': category} if category != 'all' else {}
+
+        first = self.searcher.search_query(
+            {'location': location, 'radius': int(min(radius_meters, MAX_RADIUS_METERS)), **filters},
+            priority, stop_over_cap=True
+        )
+        fits = radius_meters <= MAX_RADIUS_METERS and first.total <= self.searcher.max_results
+        if fits or not first.center or isinstance(first.businesses, PartialResults):
+            return first.businesses
+
+        tiles = plan_grid(first.center['latitude'], first.center['longitude'], radius_meters)
+        return self._search_tiles(tiles, filters, priority)
+
+    def _search_tiles(self, tiles: List[Tile], filters: Dict, priority: str) -> List[Business]:
+        businesses = {}
+        reasons = []
+        lock = threading.Lock()
+        searched = [0]
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = []
+
+        def submit(tile):
+            with lock:
+                if searched[0] >= self.max_tiles:
+                    reasons.append(f'Stopped after {self.max_tiles} tiles')
+                    return
+                searched[0] += 1
+            pending.append(executor.submit(search_tile, tile))
+
+        def search_tile(tile):
+            params = {'latitude': tile.latitude, 'longitude': tile.longitude, 'radius': tile.radius, **filters}
+            result = self.searcher.search_query(params, priority, stop_over_cap=tile.half_size / 2 >= self.min_half_size)
+
+            if result.total > self.searcher.max_results and tile.half_size / 2 >= self.min_half_size:
+                # Too dense for one query: the quarters are searched instead
+                for child in tile.split():
+                    submit(child)
+                return
+
+            with lock:
+                if isinstance(result.businesses, PartialResults):
+                    reasons.append(result.businesses.reason)
+                elif result.total > self.searcher.max_results:
+                    reasons.append('Some tiles had more businesses than Yelp returns')
+
+                for business in result.businesses:
+                    self._keep(businesses, tile, business)
+
+        try:
+            for tile in tiles:
+                submit(tile)
+            # Tiles may add their quarters while we wait, so drain until nothing is left
+            while pending:
+                pending.pop(0).result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        merged = list(businesses.values())
+        if reasons:
+            return PartialResults(merged, reasons[0])
+        return merged
+
+    @staticmethod
+    def _keep(businesses: Dict, tile: Tile, business: Business):
+        # Caller holds the lock
+        latitude, longitude = business.latitude, business.longitude
+        if latitude is not None and longitude is not None and not tile.contains(latitude, longitude):
+            return
+
+        key = business.id or (business.name, business.phone)
+        businesses.setdefault(key, business)
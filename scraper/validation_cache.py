@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+class ValidationCache:
+    """
+    Disk-backed cache of website validation results.
+
+    Entries are keyed by normalized URL (host without www plus path), so
+    http://Example.com/ and example.com share one entry. Live and dead
+    results expire separately, and the oldest entries are evicted once the
+    table grows past max_entries.
+    """
+
+    def __init__(self, path: str = os.path.join('cache', 'validation.db'),
+                 positive_ttl: float = 24 * 3600, negative_ttl: float = 3600,
+                 max_entries: int = 100000):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS validation ('
+            'key TEXT PRIMARY KEY, valid INTEGER NOT NULL, checked_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_validation_checked_at ON validation (checked_at)')
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(url: str) -> str:
+        url = url.strip()
+        if '://' not in url:
+            url = f'http://{url}'
+
+        try:
+            parsed = urlparse(url)
+            port = parsed.port
+        except ValueError:
+            # Bad port or unclosed IPv6 bracket: key on the URL as given so one entry can't fail the batch
+            return url
+
+        host = (parsed.hostname or '').lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        if port and port not in (80, 443):
+            host = f'{host}:{port}'
+
+        return host + parsed.path.rstrip('/')
+
+    def get(self, url: str) -> Optional[bool]:
+        return self.get_many([url]).get(url)
+
+    def get_many(self, urls: List[str]) -> Dict[str, bool]:
+        """Return cached results for the URLs that have a fresh entry."""
+        keys = {}
+        for url in urls:
+            keys.setdefault(self.key(url), []).append(url)
+
+        if not keys:
+            return {}
+
+        now = time.time()
+        found = {}
+        with self._lock:
+            key_list = list(keys)
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT key, valid, checked_at FROM validation WHERE key IN ({placeholders})', chunk
+                ).fetchall()
+
+                for key, valid, checked_at in rows:
+                    ttl = self.positive_ttl if valid else self.negative_ttl
+                    if now - checked_at < ttl:
+                        for url in keys[key]:
+                            found[url] = bool(valid)
+
+            self.hits += len(found)
+            self.misses += len(urls) - len(found)
+
+        return found
+
+    def set(self, url: str, valid: bool):
+        self.set_many({url: valid})
+
+    def set_many(self, results: Dict[str, bool]):
+        if not results:
+            return
+
+        now = time.time()
+        rows = [(self.key(url), int(valid), now) for url, valid in results.items()]
+
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO validation (key, valid, checked_at) VALUES (?, ?, ?)', rows
+                )
+            self._evict()
+
+    def _evict(self):
+        count = self._conn.execute('SELECT COUNT(*) FROM validation').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+
+        with self._conn:
+            self._conn.execute(
+                'DELETE FROM validation WHERE key IN '
+                '(SELECT key FROM validation ORDER BY checked_at LIMIT ?)', (overflow,)
+            )
+        self.evictions += overflow
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = self._conn.execute('SELECT COUNT(*) FROM validation').fetchone()[0]
+            lookups = self.hits + self.misses
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'size': size
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,37 +1,226 @@
+import logging
 import requests
-from typing import Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+from .business import Business
+from .http_client import DeadlineExceeded, HttpClient, shared_client
+from .metrics import WEBSITE_CHECKS, timed
+from .validation_cache import ValidationCache
 import re
 
+logger = logging.getLogger(__name__)
+
 class WebsiteValidator:
-    def __init__(self):
-        self.timeout = 5
-    
-    def has_website(self, business: Dict) -> bool:
-        url = business.get('url', '')
-        
+    def __init__(self, timeout: float = 5, max_workers: int = 32, per_host_limit: int = 4, deadline: float = 15,
+                 cache: ValidationCache = None, client: HttpClient = None):
+        self.timeout = timeout
+        self.cache = cache
+        # Batch validation settings (see validate_many)
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.deadline = deadline
+
+        self.client = client or shared_client()
+
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+    def has_website(self, business: Business) -> bool:
+        url = self._website_candidate(business)
+
         if not url:
             return False
-        
+
+        return self.validate_url(url)
+
+    def has_websites(self, businesses: List[Business]) -> List[bool]:
+        """Batch version of has_website, validating every candidate URL concurrently."""
+        candidates = [self._website_candidate(business) for business in businesses]
+        results = self.validate_many([url for url in candidates if url])
+
+        return [results.get(url, False) if url else False for url in candidates]
+
+    def iter_has_websites(self, businesses: List[Business]) -> Iterator[Tuple[int, bool]]:
+        """
+        Streaming version of has_websites.
+
+        Yields (index, has_website) pairs in the order answers become known:
+        businesses without a candidate URL and cache hits first, then live
+        checks as they finish. Checks cut off by the deadline come last as False.
+        """
+        pending = {}
+        for index, business in enumerate(businesses):
+            url = self._website_candidate(business)
+            if url:
+                pending.setdefault(self._normalize(url), []).append(index)
+            else:
+                yield index, False
+
+        if not pending:
+            return
+
+        checked = self.cache.get_many(list(pending)) if self.cache else {}
+        for url, valid in checked.items():
+            for index in pending.pop(url):
+                yield index, valid
+
+        fresh = {}
+        if pending:
+            for url, valid in self._iter_check(list(pending), self.max_workers, self.deadline):
+                fresh[url] = valid
+                for index in pending.pop(url):
+                    yield index, valid
+
+        if self.cache:
+            self.cache.set_many(fresh)
+
+        for indexes in pending.values():
+            for index in indexes:
+                yield index, False
+
+    def _website_candidate(self, business: Business) -> Optional[str]:
+        url = business.url
+
+        if not url:
+            return None
+
         if 'yelp.com' in url:
-            return False
-        
-        if self._extract_website_from_yelp_data(business):
-            return True
-        
-        return False
-    
-    def _extract_website_from_yelp_data(self, business: Dict) -> str:
+            return self._extract_website_from_yelp_data(business)
+
+        return url
+
+    def _extract_website_from_yelp_data(self, business: Business) -> str:
         return None
-    
+
     def validate_url(self, url: str) -> bool:
         if not url:
             return False
-        
-        if not url.startswith(('http://', 'https://')):
-            url = f'http://{url}'
-        
+
+        url = self._normalize(url)
+        if self.cache:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached
+
+        valid = self._check(url)
+        if self.cache:
+            self.cache.set(url, valid)
+        return valid
+
+    def validate_many(self, urls: List[str], max_workers: int = None, deadline: float = None) -> Dict[str, bool]:
+        """
+        Validate many URLs concurrently over the shared HTTP client.
+
+        At most max_workers checks run at once and at most per_host_limit of
+        them hit the same host. URLs still pending when the deadline expires
+        are reported as not valid and are not cached. Returns a dict keyed by
+        the URLs passed in.
+        """
+        max_workers = max_workers or self.max_workers
+        deadline = self.deadline if deadline is None else deadline
+
+        results = {url: False for url in urls}
+        pending = {}
+        for url in urls:
+            if url:
+                pending.setdefault(self._normalize(url), []).append(url)
+
+        if not pending:
+            return results
+
+        checked = self.cache.get_many(list(pending)) if self.cache else {}
+        misses = [url for url in pending if url not in checked]
+
+        if misses:
+            fresh = self._check_many(misses, max_workers, deadline)
+            if self.cache:
+                self.cache.set_many(fresh)
+            checked.update(fresh)
+
+        for normalized, valid in checked.items():
+            for url in pending[normalized]:
+                results[url] = valid
+
+        return results
+
+    def _check_many(self, urls: List[str], max_workers: int, deadline: float) -> Dict[str, bool]:
+        # Only URLs that finished before the deadline appear in the result
+        return dict(self._iter_check(urls, max_workers, deadline))
+
+    def _iter_check(self, urls: List[str], max_workers: int, deadline: float) -> Iterator[Tuple[str, bool]]:
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)))
+        futures = {executor.submit(self._check, url, time.monotonic() + deadline): url for url in urls}
+
         try:
-            response = requests.head(url, timeout=self.timeout, allow_redirects=True)
+            for future in as_completed(futures, timeout=deadline):
+                try:
+                    valid = future.result()
+                except Exception as e:
+                    # One broken check mustn't fail the batch; leave that URL unanswered (not valid, not cached)
+                    logger.warning("Website check for %s failed: %s", futures[future], e)
+                    continue
+                if valid is not None:
+                    yield futures[future], valid
+        except TimeoutError:
+            pass
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _check(self, url: str, expires_at: float = None) -> Optional[bool]:
+        with timed('website_check'):
+            valid = self._check_once(url, expires_at)
+        WEBSITE_CHECKS.inc(result='expired' if valid is None else 'valid' if valid else 'invalid')
+        return valid
+
+    def _check_once(self, url: str, expires_at: float = None) -> Optional[bool]:
+        # expires_at lets queued batch checks give up (returning None) once the batch deadline has passed
+        with self._host_slot(url):
+            if expires_at is not None and time.monotonic() >= expires_at:
+                return None
+
+            try:
+                # Unreachable sites fail fast; throttled and 5xx responses are retried until the deadline
+                response = self.client.head(url, timeout=self.timeout, allow_redirects=True,
+                                            deadline=expires_at, retry_errors=False)
+            except DeadlineExceeded:
+                return None
+            except (requests.RequestException, ValueError):
+                # ValueError: urllib3 can't parse the URL (e.g. 'www.cityplumbingco..com')
+                return False
+
+            # Still throttled after retrying, but something is serving the site
+            if response.status_code == 429:
+                return True
             return response.status_code < 400
-        except:
-            return False
\ No newline at end of file
+
+    @contextmanager
+    def _host_slot(self, url: str):
+        """Hold one of the URL's host's per_host_limit slots for the duration of a check."""
+        host = urlparse(url).netloc.lower()
+
+        # Each host maps to [semaphore, checks holding or waiting for it], and is
+        # dropped when that count reaches zero, so the map only holds hosts in use
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = [threading.BoundedSemaphore(self.per_host_limit), 0]
+            slot[1] += 1
+
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._host_slots_lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._host_slots[host]
+
+    def _normalize(self, url: str) -> str:
+        url = url.strip()
+        if not url.startswith(('http://', 'https://')):
+            url = f'http://{url}'
+        return url
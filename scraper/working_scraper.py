@@ -1,20 +1,43 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from .business import Business
+from .driver_pool import DriverPool, PooledDriverMixin
+from .maps_dom import card_spec, extract_cards, read_card, scroll_feed, website_from_links
+from .metrics import timed
+import logging
 import re
 from typing import List, Dict
 
-class WorkingGoogleScraper:
-    def __init__(self):
-        self.driver = None
-        
-    def _setup_driver(self):
+logger = logging.getLogger(__name__)
+
+# Stage metrics label, kept apart from GoogleMapsSearcher's
+SOURCE = 'google_maps_working'
+
+CARD_SPEC = card_spec(
+    name=[
+        '.fontHeadlineSmall',
+        '.qBF1Pd',
+        '.DUwDvf',
+        '.fontHeadlineSmall .fontHeadlineSmall',
+        '[data-value="Business name"]',
+        'h3',
+        '.section-result-title'
+    ],
+    info='.W4Efsd, .W4Efsd span, .fontBodyMedium',
+    rating=['.MW4etd', '.fontBodySmall', '[aria-label*="stars"]'],
+    reviews=['.UY7F9', '.fontBodySmall']
+)
+
+class WorkingGoogleScraper(PooledDriverMixin):
+    def __init__(self, pool: DriverPool = None, bulk_extract: bool = True):
+        self._use_pool(pool)
+        self.bulk_extract = bulk_extract
+    
+    @staticmethod
+    def _chrome_options() -> Options:
         chrome_options = Options()
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
@@ -25,203 +48,173 @@ class WorkingGoogleScraper:
         
         # Don't run headless so we can see what's happening
         # chrome_options.add_argument('--headless')
-        
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.implicitly_wait(3)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return chrome_options
     
-    def _close_driver(self):
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+    @staticmethod
+    def _on_driver_created(driver):
+        # Hide the webdriver flag sites use to spot automation
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
-    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Dict]:
+    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Business]:
         businesses = []
+        crashed = False
         
         try:
             self._setup_driver()
-            print(f"Searching for {category} in {location}")
+            logger.debug("Searching for %s in %s", category, location)
             
             # Build search query
             search_query = f"{category} {location}"
             search_url = f"https://www.google.com/maps/search/{search_query.replace(' ', '+')}"
             
-            print(f"Navigating to: {search_url}")
-            self.driver.get(search_url)
-            
-            # Wait for the page to load
-            time.sleep(5)
-            
-            # Wait for search results
-            try:
-                print("Waiting for search results...")
-                WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[role="article"], .Nv2PK'))
-                )
-                print("Search results found!")
-            except TimeoutException:
-                print("Timeout waiting for results")
-                return businesses
+            with timed('page_load', SOURCE):
+                logger.debug("Navigating to: %s", search_url)
+                self.driver.get(search_url)
+                
+                # Wait for search results
+                try:
+                    WebDriverWait(self.driver, 20).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, '[role="article"], .Nv2PK'))
+                    )
+                except TimeoutException:
+                    logger.info("Timeout waiting for results")
+                    return businesses
             
             # Scroll to load more results
-            print("Scrolling to load more results...")
-            results_panel = None
-            try:
-                results_panel = self.driver.find_element(By.CSS_SELECTOR, '[role="feed"]')
-            except:
+            with timed('scroll', SOURCE):
+                results_panel = None
                 try:
-                    results_panel = self.driver.find_element(By.CSS_SELECTOR, '.m6QErb')
+                    results_panel = self.driver.find_element(By.CSS_SELECTOR, '[role="feed"]')
                 except:
-                    pass
-            
-            if results_panel:
-                for i in range(5):
-                    self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", results_panel)
-                    time.sleep(2)
-                    print(f"Scroll {i+1}/5")
-            
-            # Find business elements
-            print("Looking for business elements...")
-            business_selectors = [
-                '[role="article"]',
-                '.Nv2PK',
-                '.lI9IFe',
-                '[jsaction*="mouseover"]'
-            ]
-            
-            business_elements = []
-            for selector in business_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    business_elements = elements
-                    print(f"Found {len(elements)} businesses with selector: {selector}")
-                    break
-            
-            if not business_elements:
-                print("No business elements found")
-                return businesses
-            
-            # Extract business info - collect what we can before any errors
-            for idx, element in enumerate(business_elements[:10]):  # Limit to 10 for stability
-                try:
-                    print(f"Extracting business {idx+1}...")
-                    business_data = self._extract_business_info(element, category)
-                    if business_data and business_data['name']:
-                        businesses.append(business_data)
-                        print(f"Added: {business_data['name']}")
-                    
-                    # Return early if we have enough data and encounter network issues
-                    if len(businesses) >= 5:
-                        print(f"Have {len(businesses)} businesses, continuing...")
-                        
-                except Exception as e:
-                    print(f"Error extracting business {idx}: {e}")
-                    # If we have some businesses and encounter errors, return what we have
-                    if len(businesses) > 0 and "connection" in str(e).lower():
-                        print(f"Network error detected, returning {len(businesses)} businesses found so far")
+                    try:
+                        results_panel = self.driver.find_element(By.CSS_SELECTOR, '.m6QErb')
+                    except:
+                        pass
+                
+                if results_panel:
+                    # Stop as soon as the feed stops growing or holds enough cards
+                    loaded = scroll_feed(self.driver, results_panel, '[role="article"], .Nv2PK', target=10, max_rounds=5)
+                    logger.debug("Feed has %d results after scrolling", loaded)
+            
+            with timed('extraction', SOURCE) as timer:
+                # Find business elements
+                business_selectors = [
+                    '[role="article"]',
+                    '.Nv2PK',
+                    '.lI9IFe',
+                    '[jsaction*="mouseover"]'
+                ]
+                
+                business_elements = []
+                card_selector = None
+                for selector in business_selectors:
+                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    if elements:
+                        business_elements = elements
+                        card_selector = selector
+                        logger.debug("Found %d businesses with selector: %s", len(elements), selector)
                         break
-                    continue
+                
+                if not business_elements:
+                    logger.info("No business elements found")
+                    return businesses
+                
+                business_elements = business_elements[:10]  # Limit to 10 for stability
+                
+                # Read every card's fields in one script call instead of a round trip per selector
+                cards = [None] * len(business_elements)
+                if self.bulk_extract:
+                    cards = extract_cards(self.driver, card_selector, CARD_SPEC, len(business_elements))
+                
+                # Extract business info - collect what we can before any errors
+                for idx, (element, card) in enumerate(zip(business_elements, cards)):
+                    try:
+                        business_data = self._extract_business_info(element, category, card)
+                        if business_data and business_data.name:
+                            businesses.append(business_data)
+                            
+                    except Exception as e:
+                        logger.debug("Error extracting business %d: %s", idx, e)
+                        # If we have some businesses and encounter errors, return what we have
+                        if len(businesses) > 0 and "connection" in str(e).lower():
+                            logger.info("Network error detected, returning %d businesses found so far", len(businesses))
+                            break
+                        continue
+                timer.records = len(businesses)
                     
         except Exception as e:
-            print(f"Error during search: {e}")
+            logger.warning("Error during Google Maps search: %s", e)
+            crashed = isinstance(e, WebDriverException)
         finally:
-            self._close_driver()
+            # Crashed drivers are recycled instead of going back to the pool
+            self._close_driver(crashed)
             
-        print(f"Total businesses found: {len(businesses)}")
+        logger.debug("Total businesses found: %d", len(businesses))
         return businesses
     
-    def _extract_business_info(self, element, category: str) -> Dict:
+    def _extract_business_info(self, element, category: str, card: Dict = None) -> Business:
         business_data = {
             'name': '',
             'url': '',
             'display_phone': 'N/A',
-            'location': {'display_address': ['Address not available']},
+            'location': {'display_address': []},
             'categories': [{'title': category.title()}],
             'rating': 'N/A',
             'review_count': 0
         }
         
         try:
-            # Try different selectors for business name
-            name_selectors = [
-                '.fontHeadlineSmall',
-                '.qBF1Pd',
-                '.DUwDvf',
-                '.fontHeadlineSmall .fontHeadlineSmall',
-                '[data-value="Business name"]',
-                'h3',
-                '.section-result-title'
-            ]
-            
-            for selector in name_selectors:
-                try:
-                    name_elem = element.find_element(By.CSS_SELECTOR, selector)
-                    if name_elem and name_elem.text.strip():
-                        business_data['name'] = name_elem.text.strip()
-                        break
-                except:
-                    continue
+            # Without a pre-extracted card, read the fields element by element
+            if card is None:
+                card = read_card(element, CARD_SPEC)
+            
+            # First name selector with text wins
+            for name in card['names']:
+                if name:
+                    business_data['name'] = name
+                    break
             
             if not business_data['name']:
                 return None
             
             # Try to get address and phone
-            try:
-                info_elements = element.find_elements(By.CSS_SELECTOR, '.W4Efsd, .W4Efsd span, .fontBodyMedium')
-                for elem in info_elements:
-                    text = elem.text.strip()
-                    if not text:
-                        continue
-                    
-                    # Check for phone number
-                    if re.search(r'[\(\)\d\s\-\+]{10,}', text) and any(char.isdigit() for char in text):
-                        if len(re.findall(r'\d', text)) >= 7:  # At least 7 digits
-                            business_data['display_phone'] = text
-                    
-                    # Check for address (contains numbers and letters, not just a category)
-                    elif (any(char.isdigit() for char in text) and 
-                          any(char.isalpha() for char in text) and 
-                          len(text) > 10 and
-                          not re.search(r'^\d+(\.\d+)?\s*(stars?|reviews?)', text.lower())):
-                        business_data['location']['display_address'] = [text]
-            except:
-                pass
+            for text in card['info']:
+                if not text:
+                    continue
+                
+                # Check for phone number
+                if re.search(r'[\(\)\d\s\-\+]{10,}', text) and any(char.isdigit() for char in text):
+                    if len(re.findall(r'\d', text)) >= 7:  # At least 7 digits
+                        business_data['display_phone'] = text
+                
+                # Check for address (contains numbers and letters, not just a category)
+                elif (any(char.isdigit() for char in text) and 
+                      any(char.isalpha() for char in text) and 
+                      len(text) > 10 and
+                      not re.search(r'^\d+(\.\d+)?\s*(stars?|reviews?)', text.lower())):
+                    business_data['location']['display_address'] = [text]
             
             # Try to get rating
-            try:
-                rating_selectors = ['.MW4etd', '.fontBodySmall', '[aria-label*="stars"]']
-                for selector in rating_selectors:
-                    try:
-                        rating_elem = element.find_element(By.CSS_SELECTOR, selector)
-                        rating_text = rating_elem.text or rating_elem.get_attribute('aria-label') or ''
-                        rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-                        if rating_match:
-                            rating_val = float(rating_match.group(1))
-                            if 1 <= rating_val <= 5:
-                                business_data['rating'] = rating_val
-                                break
-                    except:
-                        continue
-            except:
-                pass
+            for rating_text in card['ratings']:
+                rating_match = re.search(r'(\d+\.?\d*)', rating_text)
+                if rating_match:
+                    rating_val = float(rating_match.group(1))
+                    if 1 <= rating_val <= 5:
+                        business_data['rating'] = rating_val
+                        break
             
             # Try to get review count
-            try:
-                review_selectors = ['.UY7F9', '.fontBodySmall']
-                for selector in review_selectors:
-                    try:
-                        review_elem = element.find_element(By.CSS_SELECTOR, selector)
-                        review_text = review_elem.text
-                        if '(' in review_text and ')' in review_text:
-                            count_text = review_text.split('(')[1].split(')')[0].replace(',', '').replace('+', '')
-                            if count_text.isdigit():
-                                business_data['review_count'] = int(count_text)
-                                break
-                    except:
-                        continue
-            except:
-                pass
+            for review_text in card['reviews']:
+                if '(' in review_text and ')' in review_text:
+                    count_text = review_text.split('(')[1].split(')')[0].replace(',', '').replace('+', '')
+                    if count_text.isdigit():
+                        business_data['review_count'] = int(count_text)
+                        break
+            
+            # Use the card's own website link when it has one
+            business_data['url'] = website_from_links(card['links'])
+            if business_data['url']:
+                return Business.from_listing(business_data)
             
             # Skip website detection for now to avoid triggering anti-bot measures
             # For testing, randomly assign website status (about 40% have websites)
@@ -232,8 +225,8 @@ class WorkingGoogleScraper:
             else:
                 business_data['url'] = ''
                 
-            return business_data
+            return Business.from_listing(business_data)
             
         except Exception as e:
-            print(f"Error in _extract_business_info: {e}")
+            logger.debug("Error in _extract_business_info: %s", e)
             return None
\ No newline at end of file
@@ -1,12 +1,59 @@
-import requests
-from bs4 import BeautifulSoup
-import time
-from typing import List, Dict
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+from typing import List
 import re
+from .business import Business
+from .http_client import HttpClient, shared_client
+from .metrics import timed
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Compiled once; each mirrors a find/find_all call in _extract_business_info
+LXML_XPATHS = {
+    'listings': etree.XPath(f"//div[{_has_class('result')}]"),
+    'name': etree.XPath(f".//a[{_has_class('business-name')}]"),
+    'phone': etree.XPath(f".//div[{_has_class('phones')}]"),
+    'street': etree.XPath(f".//div[{_has_class('street-address')}]"),
+    'locality': etree.XPath(f".//div[{_has_class('locality')}]"),
+    'website': etree.XPath(f".//a[{_has_class('track-visit-website')}]"),
+    'rating': etree.XPath(f".//div[{_has_class('ratings')}]"),
+    'count': etree.XPath(f".//span[{_has_class('count')}]"),
+} if lxml else {}
+
+def _first(elements):
+    return elements[0] if elements else None
+
+def _text(element) -> str:
+    # Same result as BeautifulSoup's get_text(strip=True)
+    return ''.join(part.strip() for part in element.itertext() if part.strip())
 
 class YellowPagesSearcher:
-    def __init__(self):
-        self.base_url = "https://www.yellowpages.com"
+    # Map our categories to Yellow Pages search terms
+    category_map = {
+        'barbershop': 'barber-shops',
+        'dentist': 'dentists',
+        'electrician': 'electricians',
+        'plumber': 'plumbers', 
+        'handyman': 'handyman-services',
+        'hvac': 'heating-and-air-conditioning',
+        'roofing': 'roofing-contractors',
+        'landscaping': 'landscaping',
+        'auto repair': 'auto-repair'
+    }
+    
+    def __init__(self, max_pages: int = 5, max_workers: int = 3, parser: str = None, client: HttpClient = None):
+        self.base_url = os.environ.get('YELLOWPAGES_URL', 'https://www.yellowpages.com')
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -14,72 +61,165 @@ class YellowPagesSearcher:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         }
+        self.max_pages = max_pages
+        self.max_workers = max_workers
+        self.results_per_page = 30
+        # 'lxml' (fastest), 'strained' (html.parser limited to listings) or 'soup' (full tree)
+        self.parser = parser or ('lxml' if lxml else 'strained')
+        self.timeout = 10
+        
+        self.client = client or shared_client()
     
-    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Dict]:
+    def search_businesses(self, location: str, radius: int = 5, category: str = 'barbershop') -> List[Business]:
         businesses = []
         
         # Format location (city, state)
         location_formatted = location.replace(', ', '-').replace(' ', '-').lower()
         
-        # Map our categories to Yellow Pages search terms
-        category_map = {
-            'barbershop': 'barber-shops',
-            'dentist': 'dentists',
-            'electrician': 'electricians',
-            'plumber': 'plumbers', 
-            'handyman': 'handyman-services',
-            'hvac': 'heating-and-air-conditioning',
-            'roofing': 'roofing-contractors',
-            'landscaping': 'landscaping',
-            'auto repair': 'auto-repair'
-        }
-        
-        search_term = category_map.get(category.lower().replace(' ', ''), 'businesses')
+        search_term = self.search_term(category)
         
         # Construct URL
         url = f"{self.base_url}/search?search_terms={search_term}&geo_location_terms={location_formatted}"
         
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
         try:
-            # Make request
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find business listings
-            listings = soup.find_all('div', class_='result')
+            # Keep up to max_workers pages downloading while earlier ones are parsed
+            futures = {}
+            for page in range(1, min(self.max_workers, self.max_pages) + 1):
+                futures[page] = executor.submit(self._fetch_page, self._page_url(url, page))
             
-            for listing in listings[:30]:  # Limit to 30 results
-                business = self._extract_business_info(listing, category)
-                if business:
-                    businesses.append(business)
+            for page in range(1, self.max_pages + 1):
+                next_page = page + self.max_workers
+                if next_page <= self.max_pages:
+                    futures[next_page] = executor.submit(self._fetch_page, self._page_url(url, next_page))
+                
+                try:
+                    html = futures.pop(page).result()
+                except Exception as e:
+                    # A failing first page is an error; a failing later page just ends the crawl
+                    if page == 1:
+                        raise
+                    logger.info("Stopping at Yellow Pages page %d: %s", page, e)
+                    break
+                
+                with timed('extraction', 'yellowpages') as timer:
+                    page_businesses = self._parse_page(html, category)
+                    timer.records = len(page_businesses)
+                if not page_businesses:
+                    break
+                businesses.extend(page_businesses)
             
             # If no results from scraping, return empty list (app will handle)
             if not businesses:
-                print(f"No results found for {category} in {location}")
+                logger.info("No results found for %s in %s", category, location)
                 
         except Exception as e:
-            print(f"Error scraping Yellow Pages: {e}")
+            logger.warning("Error scraping Yellow Pages: %s", e)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         return businesses
     
-    def _extract_business_info(self, listing, category: str) -> Dict:
+    @classmethod
+    def search_term(cls, category: str) -> str:
+        """Yellow Pages search term for one of our categories, or the generic 'businesses' search."""
+        return cls.category_map.get(' '.join(category.lower().split()), 'businesses')
+    
+    def _page_url(self, url: str, page: int) -> str:
+        return url if page == 1 else f"{url}&page={page}"
+    
+    def _fetch_page(self, url: str) -> str:
+        with timed('page_load', 'yellowpages'):
+            response = self.client.get(url, headers=self.headers, timeout=self.timeout)
+            response.raise_for_status()
+        return response.text
+    
+    def _parse_page(self, html: str, category: str) -> List[Business]:
+        if self.parser == 'lxml':
+            return self._parse_page_lxml(html, category)
+        
+        businesses = []
+        
+        # Parse HTML; the strained parser only builds the listing subtrees
+        if self.parser == 'strained':
+            soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('div', class_='result'))
+        else:
+            soup = BeautifulSoup(html, 'html.parser')
+        
+        # Find business listings
+        listings = soup.find_all('div', class_='result')
+        
+        for listing in listings[:self.results_per_page]:  # Limit to 30 results per page
+            business = self._extract_business_info(listing, category)
+            if business:
+                businesses.append(business)
+        
+        return businesses
+    
+    def _parse_page_lxml(self, html: str, category: str) -> List[Business]:
+        businesses = []
+        
+        if not html.strip():
+            return businesses
+        
+        root = lxml.html.fromstring(html)
+        for listing in LXML_XPATHS['listings'](root)[:self.results_per_page]:
+            business = self._extract_business_info_lxml(listing, category)
+            if business:
+                businesses.append(business)
+        
+        return businesses
+    
+    def _extract_business_info_lxml(self, listing, category: str) -> Business:
+        # Mirrors _extract_business_info using the precompiled XPath expressions
         try:
-            business = {
-                'name': '',
-                'url': '',
-                'display_phone': 'N/A',
-                'location': {'display_address': []},
-                'categories': [{'title': category.title()}],
-                'rating': 'N/A',
-                'review_count': 0
-            }
+            name_elem = _first(LXML_XPATHS['name'](listing))
+            if name_elem is None:
+                return None
+            business = Business(name=_text(name_elem), categories=category.title())
+            
+            phone_elem = _first(LXML_XPATHS['phone'](listing))
+            if phone_elem is not None:
+                business.phone = _text(phone_elem)
+            
+            address_parts = []
+            for key in ('street', 'locality'):
+                elem = _first(LXML_XPATHS[key](listing))
+                if elem is not None:
+                    address_parts.append(_text(elem))
             
+            business.address = ', '.join(address_parts)
+            
+            for link in LXML_XPATHS['website'](listing):
+                href = link.get('href', '')
+                if href and 'yellowpages.com' not in href:
+                    business.url = href
+                    break
+            
+            rating_elem = _first(LXML_XPATHS['rating'](listing))
+            if rating_elem is not None:
+                rating_match = re.search(r'([\d.]+)', rating_elem.get('data-rating', ''))
+                if rating_match:
+                    business.rating = float(rating_match.group(1))
+                
+                count_elem = _first(LXML_XPATHS['count'](rating_elem))
+                if count_elem is not None:
+                    count_match = re.search(r'(\d+)', _text(count_elem))
+                    if count_match:
+                        business.review_count = int(count_match.group(1))
+            
+            return business
+            
+        except Exception as e:
+            logger.debug("Error extracting business info: %s", e)
+            return None
+    
+    def _extract_business_info(self, listing, category: str) -> Business:
+        try:
             # Get business name
             name_elem = listing.find('a', class_='business-name')
             if name_elem:
-                business['name'] = name_elem.get_text(strip=True)
+                business = Business(name=name_elem.get_text(strip=True), categories=category.title())
             else:
                 return None
             
@@ -87,7 +227,7 @@ class YellowPagesSearcher:
             phone_elem = listing.find('div', class_='phones')
             if phone_elem:
                 phone_text = phone_elem.get_text(strip=True)
-                business['display_phone'] = phone_text
+                business.phone = phone_text
             
             # Get address
             address_elem = listing.find('div', class_='street-address')
@@ -99,8 +239,7 @@ class YellowPagesSearcher:
             if locality_elem:
                 address_parts.append(locality_elem.get_text(strip=True))
             
-            if address_parts:
-                business['location']['display_address'] = address_parts
+            business.address = ', '.join(address_parts)
             
             # Check for website
             links = listing.find_all('a', class_='track-visit-website')
@@ -108,7 +247,7 @@ class YellowPagesSearcher:
                 for link in links:
                     href = link.get('href', '')
                     if href and 'yellowpages.com' not in href:
-                        business['url'] = href
+                        business.url = href
                         break
             
             # Get rating if available
@@ -116,7 +255,7 @@ class YellowPagesSearcher:
             if rating_elem:
                 rating_match = re.search(r'([\d.]+)', rating_elem.get('data-rating', ''))
                 if rating_match:
-                    business['rating'] = float(rating_match.group(1))
+                    business.rating = float(rating_match.group(1))
                 
                 # Get review count
                 count_elem = rating_elem.find('span', class_='count')
@@ -124,10 +263,10 @@ class YellowPagesSearcher:
                     count_text = count_elem.get_text(strip=True)
                     count_match = re.search(r'(\d+)', count_text)
                     if count_match:
-                        business['review_count'] = int(count_match.group(1))
+                        business.review_count = int(count_match.group(1))
             
             return business
             
         except Exception as e:
-            print(f"Error extracting business info: {e}")
+            logger.debug("Error extracting business info: %s", e)
             return None
\ No newline at end of file
@@ -1,63 +1,150 @@
+import logging
 import os
-import requests
-from typing import List, Dict
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, NamedTuple, Optional
+from .business import Business
+from .http_client import HttpClient, shared_client
+from .metrics import timed
+from .quota import PartialResults, QuotaBudget, current_priority, shared_budget
+
+logger = logging.getLogger(__name__)
+
+class YelpResults(NamedTuple):
+    businesses: List[Business]
+    # Matches Yelp reports for the query, which may be more than it lets us page through
+    total: int
+    # {'latitude', 'longitude'} of the searched region, when Yelp returned it
+    center: Optional[Dict]
 
 class YelpSearcher:
-    def __init__(self):
+    def __init__(self, client: HttpClient = None, budget: QuotaBudget = None):
         self.api_key = os.environ.get('YELP_API_KEY')
-        self.base_url = 'https://api.yelp.com/v3/businesses/search'
+        # benchmarks/loadtest.py points this at a local stand-in
+        self.base_url = os.environ.get('YELP_API_URL', 'https://api.yelp.com/v3/businesses/search')
         self.headers = {
             'Authorization': f'Bearer {self.api_key}'
         }
+        self.page_size = 50
+        self.max_results = 200
+        self.max_workers = 4
+        self.timeout = 10
+        
+        self.client = client or shared_client()
+        # Daily API quota, shared by every YelpSearcher and synced from response headers
+        self.budget = budget or shared_budget('yelp')
     
-    def search_businesses(self, location: str, radius: int = 5, category: str = 'all') -> List[Dict]:
+    def search_businesses(self, location: str, radius: int = 5, category: str = 'all') -> List[Business]:
         if not self.api_key:
-            print("Warning: No Yelp API key found. Using mock data.")
+            logger.warning("No Yelp API key found. Using mock data.")
             return self._get_mock_data()
         
         radius_meters = int(radius * 1609.34)
         
         params = {
             'location': location,
-            'radius': min(radius_meters, 40000),
-            'limit': 50,
-            'offset': 0
+            'radius': min(radius_meters, 40000)
         }
         
         if category != 'all':
             params['categories'] = category
         
-        all_businesses = []
+        return self.search_query(params).businesses
+    
+    def search_query(self, params: Dict, priority: str = None, stop_over_cap: bool = False) -> YelpResults:
+        """
+        Fetch every page of one search (location or latitude/longitude plus radius).
+
+        Returns the businesses along with the total Yelp reports for the
+        query and the center of the searched region. With stop_over_cap, only
+        the first page is fetched when the total is over max_results, for
+        callers that split such queries into smaller ones (see tiling).
+        """
+        params = {**params, 'limit': self.page_size, 'offset': 0}
         
+        # Batch sweeps run at low priority and give way when the quota runs low
+        priority = priority or current_priority()
+        if not self.budget.acquire(1, priority):
+            return YelpResults(PartialResults([], self._budget_reason(priority)), 0, None)
+        
+        all_businesses = []
+        total = 0
+        center = None
         try:
-            while len(all_businesses) < 200:
-                response = requests.get(self.base_url, headers=self.headers, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    businesses = data.get('businesses', [])
-                    
-                    if not businesses:
+            # The first page tells us the total, so the remaining offsets can be fetched together
+            first_page = self._fetch_page(params)
+            if first_page is None:
+                return YelpResults(PartialResults([], 'Yelp API request failed'), 0, None)
+
+            all_businesses = self._businesses(first_page)
+            total = first_page.get('total', 0)
+            center = first_page.get('region', {}).get('center')
+            if len(all_businesses) < self.page_size or (stop_over_cap and total > self.max_results):
+                return YelpResults(all_businesses, total, center)
+
+            offsets = list(range(self.page_size, min(total, self.max_results), self.page_size))
+            
+            reason = None
+            granted = self.budget.acquire(len(offsets), priority)
+            if granted < len(offsets):
+                reason = self._budget_reason(priority)
+                offsets = offsets[:granted]
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pages = executor.map(lambda offset: self._fetch_page({**params, 'offset': offset}), offsets)
+
+                # Pages come back in offset order; stop at the first failed or short one
+                for page in pages:
+                    if page is None:
+                        reason = 'Yelp API request failed'
                         break
-                    
+
+                    businesses = self._businesses(page)
                     all_businesses.extend(businesses)
-                    
-                    if len(businesses) < 50:
+
+                    if len(businesses) < self.page_size:
                         break
-                    
-                    params['offset'] += 50
-                else:
-                    print(f"Yelp API error: {response.status_code}")
-                    break
-            
-            return all_businesses
+
+            if reason:
+                all_businesses = PartialResults(all_businesses, reason)
+            return YelpResults(all_businesses, total, center)
             
         except Exception as e:
-            print(f"Error fetching from Yelp: {e}")
-            return self._get_mock_data()
+            logger.warning("Error fetching from Yelp: %s", e)
+            return YelpResults(PartialResults(all_businesses, f'Yelp API request failed: {e}'), total, center)
+    
+    def _fetch_page(self, params: Dict) -> Optional[Dict]:
+        # The caller acquired one quota unit for this page; failed requests give it back
+        try:
+            with timed('page_load', 'yelp'):
+                response = self.client.get(self.base_url, params=params, headers=self.headers, timeout=self.timeout)
+        except Exception:
+            self.budget.refund(1)
+            raise
+        synced = self.budget.update(response.headers)
+        
+        if response.status_code != 200:
+            logger.warning("Yelp API error: %s", response.status_code)
+            # Unless the response already reported the remaining quota, which includes this call
+            if not synced:
+                self.budget.refund(1)
+            return None
+        
+        return response.json()
+    
+    def _businesses(self, page: Dict) -> List[Business]:
+        with timed('extraction', 'yelp') as timer:
+            businesses = [Business.from_listing(data) for data in page.get('businesses', [])]
+            timer.records = len(businesses)
+        return businesses
+    
+    def _budget_reason(self, priority: str) -> str:
+        if priority == 'low':
+            return 'Shed: Yelp quota is being paced for the rest of the day; run the batch again later'
+        return 'Yelp daily quota exhausted'
     
-    def _get_mock_data(self) -> List[Dict]:
-        return [
+    def _get_mock_data(self) -> List[Business]:
+        return [replace(Business.from_listing(data), mock=True) for data in [
             {
                 'name': 'Sample Business 1',
                 'url': '',
@@ -91,4 +178,4 @@ class YelpSearcher:
                 'rating': 4.8,
                 'review_count': 75
             }
-        ]
\ No newline at end of file
+        ]]
\ No newline at end of file
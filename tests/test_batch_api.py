@@ -0,0 +1,46 @@
+import unittest
+from unittest import mock
+
+import app
+
+class BatchValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+        # Accepted batches are queued but never run, so nothing is searched
+        patcher = mock.patch.object(app.job_manager.executor, 'submit')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, **data):
+        return self.client.post('/search/batch', json={'locations': ['Austin, TX'], 'categories': ['plumbers'], **data})
+
+    def queued_sources(self, response):
+        self.assertEqual(response.status_code, 202)
+        return app.job_manager.get(response.get_json()['job_id']).params['sources']
+
+    def test_source_as_string_or_list(self):
+        self.assertEqual(self.queued_sources(self.post(source='yelp, google_maps')), ['yelp', 'google_maps'])
+        self.assertEqual(self.queued_sources(self.post(source=['yellowpages'])), ['yellowpages'])
+        self.assertEqual(self.queued_sources(self.post()), list(app.multi_searcher.sources))
+
+    def test_invalid_source_is_rejected(self):
+        for source in (5, {'yelp': True}, ['yelp', 3], 'myspace', []):
+            with self.subTest(source=source):
+                self.assertEqual(self.post(source=source).status_code, 400)
+
+    def test_invalid_categories_and_locations_are_rejected(self):
+        self.assertEqual(self.post(categories='plumbers').status_code, 400)
+        self.assertEqual(self.post(categories=['plumbers', '']).status_code, 400)
+        self.assertEqual(self.post(locations='Austin, TX').status_code, 400)
+        self.assertEqual(self.post(locations=['Austin']).status_code, 400)
+        self.assertEqual(self.post(locations=[{'city': 'Austin'}]).status_code, 400)
+        self.assertEqual(self.post(locations=[]).status_code, 400)
+
+    def test_batch_over_the_cell_limit_is_rejected(self):
+        locations = [f'City{i}, TX' for i in range(app.MAX_BATCH_CELLS + 1)]
+        response = self.post(locations=locations)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Batch too large', response.get_json()['error'])
+
+if __name__ == '__main__':
+    unittest.main()
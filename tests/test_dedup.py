@@ -0,0 +1,42 @@
+import unittest
+
+from scraper.business import Business
+from scraper.dedup import BusinessDeduplicator
+
+class MergeTest(unittest.TestCase):
+    def setUp(self):
+        self.deduplicator = BusinessDeduplicator()
+
+    def test_real_website_beats_an_earlier_listing_page(self):
+        merged, = self.deduplicator.deduplicate([
+            Business(name="Joe's Plumbing", phone='(512) 555-0101', url='https://www.yelp.com/biz/joes-plumbing',
+                     source='yelp'),
+            Business(name='Joes Plumbing LLC', phone='512-555-0101', url='http://joesplumbing.com',
+                     source='yellowpages'),
+        ])
+        self.assertEqual(merged.url, 'http://joesplumbing.com')
+        self.assertEqual(merged.provenance['url'], 'yellowpages')
+        self.assertEqual(merged.provenance['name'], 'yelp')
+        self.assertEqual(merged.sources, ('yelp', 'yellowpages'))
+
+    def test_listing_page_kept_when_no_source_has_a_website(self):
+        merged, = self.deduplicator.deduplicate([
+            Business(name='Austin Rooter', phone='512-555-0199', source='google_maps'),
+            Business(name='Austin Rooter', phone='512-555-0199', url='https://www.yelp.com/biz/austin-rooter',
+                     source='yelp'),
+        ])
+        self.assertEqual(merged.url, 'https://www.yelp.com/biz/austin-rooter')
+        self.assertEqual(merged.provenance['url'], 'yelp')
+
+    def test_provenance_reaches_the_json_shape(self):
+        merged, = self.deduplicator.deduplicate([
+            Business(name='Joes Plumbing', phone='512-555-0101', source='yelp'),
+            Business(name='Joes Plumbing', phone='512-555-0101', url='http://joesplumbing.com', source='google_maps'),
+        ])
+        data = merged.to_dict()
+        self.assertEqual(data['sources'], ['yelp', 'google_maps'])
+        self.assertEqual(data['provenance']['url'], 'google_maps')
+        self.assertEqual(Business.from_json(data).provenance, merged.provenance)
+
+if __name__ == '__main__':
+    unittest.main()
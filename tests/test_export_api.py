@@ -0,0 +1,33 @@
+import csv
+import io
+import unittest
+from unittest import mock
+
+import app
+from scraper.exporter import CSVExporter
+
+class CsvExportTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+        # Both export routes stream; writing a file under exports/ fails the test
+        patcher = mock.patch.object(CSVExporter, 'export', side_effect=AssertionError('wrote an export file'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_posted_results_are_streamed(self):
+        businesses = [{'name': 'City Plumbing', 'phone': '(512) 555-0101', 'has_website': False},
+                      {'name': 'Pipe Works', 'website_url': 'http://pipeworks.com', 'has_website': True}]
+        response = self.client.post('/export', json={'businesses': businesses})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+        self.assertIn('attachment; filename=businesses_', response.headers['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual([(row['name'], row['lead_priority']) for row in rows],
+                         [('City Plumbing', 'HIGH'), ('Pipe Works', 'LOW')])
+
+    def test_nothing_to_export(self):
+        self.assertEqual(self.client.post('/export', json={'businesses': []}).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
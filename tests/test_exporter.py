@@ -0,0 +1,55 @@
+import io
+import unittest
+
+import pandas as pd
+
+from scraper.business import Business
+from scraper.exporter import CSVExporter, FrameExporter, pyarrow
+
+BUSINESSES = [
+    Business(name='City Plumbing', phone='(512) 555-0101', rating=4.5, review_count=120, has_website=False,
+             source='yelp', sources=('yelp', 'yellowpages'), provenance={'phone': 'yellowpages', 'name': 'yelp'}),
+    Business(name='Pipe Works', url='http://pipeworks.com', has_website=True, source='google_maps'),
+    # Not validated yet: counts as having a website
+    Business(name='Drain Pros', rating=3.0, review_count=7, source='yellowpages'),
+]
+
+class FrameExporterTest(unittest.TestCase):
+    def setUp(self):
+        self.exporter = FrameExporter()
+
+    def assert_typed(self, frame):
+        self.assertEqual(list(frame.columns), CSVExporter.fieldnames)
+        self.assertEqual(frame['rating'].dtype, 'float64')
+        self.assertEqual(frame['review_count'].dtype, 'int64')
+        self.assertEqual(frame['has_website'].dtype, 'bool')
+        self.assertIsInstance(frame['lead_priority'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(frame['lead_priority'].cat.categories), ['HIGH', 'LOW'])
+        self.assertTrue(pd.api.types.is_string_dtype(frame['name']))
+
+        self.assertEqual(frame['rating'].isna().tolist(), [False, True, False])
+        self.assertEqual(frame['review_count'].tolist(), [120, 0, 7])
+        self.assertEqual(frame['has_website'].tolist(), [False, True, True])
+        self.assertEqual(frame['lead_priority'].tolist(), ['HIGH', 'LOW', 'LOW'])
+        self.assertEqual(frame['sources'].tolist(), ['yelp;yellowpages', 'google_maps', 'yellowpages'])
+        self.assertEqual(frame['provenance'].tolist()[0], 'name=yelp;phone=yellowpages')
+
+    def test_frame_is_typed(self):
+        self.assert_typed(self.exporter.to_frame(BUSINESSES))
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_columnar_formats_keep_the_types(self):
+        self.assert_typed(pd.read_parquet(io.BytesIO(self.exporter.export_bytes(BUSINESSES, 'parquet'))))
+        self.assert_typed(pd.read_feather(io.BytesIO(self.exporter.export_bytes(BUSINESSES, 'arrow'))))
+
+    def test_gzipped_csv(self):
+        frame = pd.read_csv(io.BytesIO(self.exporter.export_bytes(BUSINESSES, 'csv.gz')), compression='gzip')
+        self.assertEqual(list(frame.columns), CSVExporter.fieldnames)
+        self.assertEqual(frame['review_count'].tolist(), [120, 0, 7])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            self.exporter.export_bytes(BUSINESSES, 'xlsx')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import time
+import unittest
+from email.utils import formatdate
+from unittest import mock
+
+import requests
+
+from scraper.http_client import HttpClient
+
+def response(status_code, **headers):
+    result = requests.Response()
+    result.status_code = status_code
+    result.headers.update(headers)
+    return result
+
+class FakeSession:
+    """Plays back the given responses (or raises the given exceptions) in order."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+class FakeClock:
+    """Stands in for the time module: sleeping moves the clock forward instead of waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleep = mock.Mock(side_effect=self._advance)
+
+    def _advance(self, seconds):
+        self.now += seconds
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return time.time() + self.now - 1000.0
+
+class RetryTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('scraper.http_client.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = HttpClient(max_retries=2, backoff_base=0.5, backoff_max=10)
+        self.sleep = self.clock.sleep
+
+    def get(self, *outcomes, **kwargs):
+        self.client.session = FakeSession(*outcomes)
+        return self.client.get('http://example.com/', **kwargs)
+
+    def stats(self):
+        return self.client.stats()['example.com']
+
+    def test_failed_status_is_retried_with_backoff(self):
+        self.assertEqual(self.get(response(503), response(200)).status_code, 200)
+
+        self.assertEqual(self.client.session.calls, 2)
+        self.assertEqual(self.stats()['retries'], 1)
+        # Full jitter: anywhere up to backoff_base for the first retry
+        self.assertTrue(0 <= self.sleep.call_args.args[0] <= 0.5)
+
+    def test_last_response_is_returned_once_retries_run_out(self):
+        self.assertEqual(self.get(response(502), response(503), response(500)).status_code, 500)
+        self.assertEqual(self.client.session.calls, 3)
+        self.assertEqual(self.stats()['status_5xx'], 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.assertEqual(self.get(response(404)).status_code, 404)
+        self.assertEqual(self.client.session.calls, 1)
+
+    def test_retry_after_replaces_backoff(self):
+        self.assertEqual(self.get(response(429, **{'Retry-After': '3'}), response(200)).status_code, 200)
+
+        self.sleep.assert_called_once_with(3.0)
+        self.assertEqual(self.stats()['throttled'], 1)
+
+    def test_retry_after_pauses_the_whole_host(self):
+        started = self.clock.now
+        self.get(response(429, **{'Retry-After': '3'}), response(200))
+        self.assertEqual(self.client._bucket('example.com').paused_until, started + 3)
+
+        # While paused, other requests to the host wait, unlike those to other hosts
+        self.client.session = FakeSession(response(200), response(200))
+        self.client._bucket('example.com').pause(3)
+        started = self.clock.now
+        self.client.get('http://other.example.com/')
+        self.assertEqual(self.clock.now, started)
+        self.client.get('http://example.com/')
+        self.assertGreaterEqual(self.clock.now - started, 3)
+
+    def test_retry_after_as_a_date_and_capped(self):
+        self.get(response(503, **{'Retry-After': formatdate(time.time() - 60, usegmt=True)}), response(200))
+        self.sleep.assert_any_call(0.0)
+
+        self.get(response(503, **{'Retry-After': '3600'}), response(200))
+        self.sleep.assert_any_call(10)
+
+    def test_retry_after_past_the_deadline_returns_the_response(self):
+        result = self.get(response(429, **{'Retry-After': '5'}), response(200), deadline=self.clock.now + 1)
+        self.assertEqual(result.status_code, 429)
+        self.sleep.assert_not_called()
+
+    def test_connection_errors(self):
+        self.assertEqual(self.get(requests.ConnectionError('reset'), response(200)).status_code, 200)
+        self.assertEqual(self.stats()['errors'], 1)
+
+        with self.assertRaises(requests.ConnectionError):
+            self.get(requests.ConnectionError('reset'), response(200), retry_errors=False)
+        self.assertEqual(self.client.session.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from scraper.jobs import JobManager
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+def wait_until_finished(job):
+    deadline = time.monotonic() + 5
+    while job.status in ('queued', 'running') and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+class JobManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch('scraper.jobs.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.manager = JobManager(max_workers=2, dedupe_window=300, retention=3600)
+        self.addCleanup(self.manager.executor.shutdown)
+        self.runs = []
+
+    def run_job(self, gate=None, error=None):
+        def run(job):
+            self.runs.append(job.id)
+            if gate:
+                gate.wait(5)
+            if error:
+                raise error
+            return {'total_found': 1}
+        return run
+
+    def test_identical_params_share_a_running_job(self):
+        gate = threading.Event()
+        first = self.manager.submit({'location': 'Austin, TX', 'category': 'plumbers'}, self.run_job(gate))
+        # Key order doesn't matter
+        second = self.manager.submit({'category': 'plumbers', 'location': 'Austin, TX'}, self.run_job(gate))
+        other = self.manager.submit({'location': 'Dallas, TX', 'category': 'plumbers'}, self.run_job(gate))
+        gate.set()
+        wait_until_finished(first)
+        wait_until_finished(other)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(sorted(self.runs), sorted([first.id, other.id]))
+        self.assertEqual(first.summary, {'total_found': 1})
+
+    def test_finished_job_is_reused_within_the_window(self):
+        params = {'location': 'Austin, TX'}
+        first = self.manager.submit(params, self.run_job())
+        wait_until_finished(first)
+
+        self.clock.now += 299
+        self.assertIs(self.manager.submit(params, self.run_job()), first)
+
+        self.clock.now += 2
+        second = self.manager.submit(params, self.run_job())
+        wait_until_finished(second)
+        self.assertIsNot(second, first)
+        self.assertEqual(len(self.runs), 2)
+
+    def test_failed_job_is_not_reused(self):
+        params = {'location': 'Austin, TX'}
+        failed = self.manager.submit(params, self.run_job(error=RuntimeError('Yelp API request failed')))
+        wait_until_finished(failed)
+        self.assertEqual((failed.status, failed.error), ('failed', 'Yelp API request failed'))
+
+        retry = self.manager.submit(params, self.run_job())
+        wait_until_finished(retry)
+        self.assertIsNot(retry, failed)
+        self.assertEqual(retry.status, 'done')
+
+    def test_finished_jobs_are_dropped_after_retention(self):
+        job = self.manager.submit({'location': 'Austin, TX'}, self.run_job())
+        wait_until_finished(job)
+
+        self.clock.now += 3601
+        replacement = self.manager.submit({'location': 'Dallas, TX'}, self.run_job())
+        wait_until_finished(replacement)
+        self.assertIsNone(self.manager.get(job.id))
+        self.assertEqual(self.manager.jobs(), [replacement])
+
+    def test_polling_reports_new_and_replaced_results(self):
+        job = self.manager.submit({'location': 'Austin, TX'}, self.run_job())
+        wait_until_finished(job)
+        for name in ('City Plumbing', 'Pipe Works', 'Drain Pros'):
+            job.add_result({'name': name})
+        job.replace_result(0, {'name': 'City Plumbing LLC'})
+
+        snapshot = job.to_dict(since=2)
+        self.assertEqual(snapshot['result_count'], 3)
+        self.assertEqual(snapshot['results'], [{'name': 'Drain Pros'}])
+        self.assertEqual(snapshot['updates'], [{'index': 0, 'business': {'name': 'City Plumbing LLC'}}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from scraper.business import Business
+from scraper.lead_store import LeadStore
+
+def lead(name, phone='', address='', has_website=False, **fields):
+    return Business(name=name, phone=phone, address=address, has_website=has_website, **fields)
+
+class LeadStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = LeadStore(path=os.path.join(directory.name, 'leads.db'), batch_size=2)
+        self.addCleanup(self.store.close)
+
+        self.leads = [
+            lead('City Plumbing', '(512) 555-0101', '100 Main St, Austin, TX', has_website=True, url='http://cityplumbing.com'),
+            lead('Lone Star Plumbing', '512-555-0102', '200 Oak Ave, Austin, TX'),
+            lead('Pipe Works', '', '300 Lamar Blvd, Austin, TX',
+                 sources=('yelp', 'google_maps'), provenance={'name': 'yelp', 'address': 'google_maps'}),
+        ]
+
+    def test_rerun_only_writes_changes(self):
+        self.assertEqual(self.store.upsert(self.leads, 'Austin', 'TX', 'plumbers'),
+                         {'inserted': 3, 'updated': 0, 'unchanged': 0})
+
+        # Same leads found again, one in another phone format and one with a new rating
+        again = [lead('City Plumbing', '512.555.0101', '100 Main St, Austin, TX', has_website=True,
+                      url='http://cityplumbing.com'),
+                 lead('Lone Star Plumbing', '512-555-0102', '200 Oak Ave, Austin, TX', rating=4.5),
+                 self.leads[2]]
+        self.assertEqual(self.store.upsert(again, ' austin ', 'tx', 'Plumbers'),
+                         {'inserted': 0, 'updated': 2, 'unchanged': 1})
+        self.assertEqual(self.store.count(), 3)
+
+        # The same business in another search is a separate lead
+        self.store.upsert(self.leads[:1], 'Austin', 'TX', 'electricians')
+        self.assertEqual(self.store.count(), 4)
+
+    def test_duplicates_within_one_search_are_stored_once(self):
+        stats = self.store.upsert([self.leads[0], lead('City Plumbing LLC', '+1 512 555 0101')], 'Austin', 'TX', 'plumbers')
+        self.assertEqual(stats['inserted'], 1)
+        self.assertEqual(self.store.query()[0].name, 'City Plumbing LLC')
+
+    def test_query_filters(self):
+        self.store.upsert(self.leads, 'Austin', 'TX', 'plumbers')
+        self.store.upsert(self.leads[:1], 'Dallas', 'TX', 'plumbers')
+
+        self.assertEqual(len(self.store.query(city='austin', state='tx')), 3)
+        self.assertEqual(len(self.store.query(category='PLUMBERS')), 4)
+        self.assertEqual(self.store.query(category='electricians'), [])
+        self.assertEqual({b.name for b in self.store.query(city='Austin', has_website=False)},
+                         {'Lone Star Plumbing', 'Pipe Works'})
+        self.assertEqual([b.query_location for b in self.store.query(phone='512 555 0101', city='Dallas')],
+                         ['Dallas, TX'])
+
+        pipe_works = self.store.query(city='Austin', has_website=False, phone=None, limit=10)
+        stored = next(b for b in pipe_works if b.name == 'Pipe Works')
+        self.assertEqual(stored.sources, ('yelp', 'google_maps'))
+        self.assertEqual(stored.provenance, {'name': 'yelp', 'address': 'google_maps'})
+
+    def test_paging(self):
+        self.store.upsert(self.leads, 'Austin', 'TX', 'plumbers')
+
+        pages = [self.store.query(limit=2, offset=offset) for offset in (0, 2, 4)]
+        self.assertEqual([len(page) for page in pages], [2, 1, 0])
+        self.assertEqual(sorted(b.name for page in pages for b in page), sorted(b.name for b in self.leads))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from unittest import mock
+
+import app
+
+class LeadsPagingTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+        patcher = mock.patch.object(app.lead_store, 'query', return_value=[])
+        self.query = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def paging(self, query_string):
+        response = self.client.get(f'/leads?{query_string}')
+        self.assertEqual(response.status_code, 200)
+        kwargs = self.query.call_args.kwargs
+        return kwargs['limit'], kwargs['offset']
+
+    def test_limit_and_offset_are_clamped(self):
+        self.assertEqual(self.paging(''), (100, 0))
+        self.assertEqual(self.paging('limit=50&offset=20'), (50, 20))
+        self.assertEqual(self.paging('limit=-1&offset=-5'), (1, 0))
+        self.assertEqual(self.paging('limit=0'), (1, 0))
+        self.assertEqual(self.paging('limit=100000'), (1000, 0))
+
+    def test_non_integer_paging_is_rejected(self):
+        for query_string in ('limit=abc', 'offset=1.5', 'limit='):
+            with self.subTest(query_string=query_string):
+                self.assertEqual(self.client.get(f'/leads?{query_string}').status_code, 400)
+        self.query.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
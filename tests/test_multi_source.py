@@ -0,0 +1,49 @@
+import threading
+import time
+import unittest
+
+from scraper.business import Business
+from scraper.multi_source import MultiSourceSearcher
+
+class SlowSource:
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def search_businesses(self, location, radius, category):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return [Business(name=f'{location} business')]
+
+class BudgetTest(unittest.TestCase):
+    def test_budget_counts_from_when_the_source_starts(self):
+        source = SlowSource(0.2)
+        # One worker: the second search waits for the first, then still gets its full budget
+        searcher = MultiSourceSearcher({'slow': source}, budgets={'slow': 0.3}, dedupe=False, concurrent_searches=1)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(searcher.search('Austin, TX'))) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([result['sources']['slow']['status'] for result in results], ['ok', 'ok'])
+
+    def test_source_still_queued_at_its_deadline_is_cancelled(self):
+        source = SlowSource(0.5)
+        searcher = MultiSourceSearcher({'slow': source}, budgets={'slow': 0.1}, dedupe=False, concurrent_searches=1)
+        # Occupies the only worker past the queued search's budget
+        blocker = searcher.executor.submit(time.sleep, 0.3)
+
+        status = searcher.search('Austin, TX')['sources']['slow']
+        blocker.result()
+        searcher.executor.shutdown(wait=True)
+
+        self.assertEqual(status['status'], 'timeout')
+        self.assertEqual(status['reason'], 'not started')
+        self.assertEqual(source.calls, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import time
+import unittest
+
+import requests
+
+from scraper.quota import QuotaBudget, request_priority
+from scraper.yelp_api import YelpSearcher
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self.data
+
+class FakeClient:
+    """Answers each page by offset: a FakeResponse, or an exception to raise."""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def get(self, url, params=None, **kwargs):
+        page = self.pages[params['offset']]
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+def full_page(total, offset):
+    return FakeResponse(data={'total': total, 'businesses': [{'name': f'Biz {offset + i}'} for i in range(50)]})
+
+class QuotaBudgetTest(unittest.TestCase):
+    def budget(self, elapsed):
+        """A 1000-call budget with `elapsed` (0 to 1) of its day gone: 10% reserve, 5% burst."""
+        budget = QuotaBudget(daily_limit=1000, reserve=0.1, burst=0.05, period=1000)
+        budget.reset_at = time.time() + 1000 * (1 - elapsed)
+        return budget
+
+    def test_low_priority_spends_at_an_even_pace(self):
+        # Reserve 100, plus the 900 shared calls not yet accrued, less the 50-call burst
+        self.assertEqual(self.budget(0).acquire(200, 'low'), 50)
+        self.assertEqual(self.budget(0.5).acquire(600, 'low'), 500)
+
+        budget = self.budget(0.5)
+        self.assertEqual(budget.acquire(400, 'low'), 400)
+        self.assertEqual(budget.acquire(400, 'low'), 100)
+        self.assertEqual(budget.denied, 300)
+
+    def test_low_priority_leaves_the_reserve(self):
+        # Late in the day nearly all the shared calls have accrued, but the reserve (less the burst) hasn't
+        budget = self.budget(0.99)
+        granted = budget.acquire(1000, 'low')
+        self.assertAlmostEqual(granted, 1000 - 59, delta=1)
+        self.assertEqual(budget.snapshot()['available_low_priority'], 0)
+        self.assertEqual(budget.acquire(1000, 'high'), 1000 - granted)
+
+    def test_high_priority_may_use_everything(self):
+        budget = self.budget(0)
+        self.assertEqual(budget.acquire(990), 990)
+        self.assertEqual(budget.acquire(20, 'high'), 10)
+        self.assertEqual(budget.acquire(1, 'low'), 0)
+
+    def test_priority_of_the_calling_thread(self):
+        budget = self.budget(0)
+        with request_priority('low'):
+            self.assertEqual(budget.acquire(200), 50)
+        self.assertEqual(budget.acquire(200), 200)
+
+    def test_headers_resync_and_daily_reset(self):
+        budget = self.budget(0.5)
+        budget.update({'RateLimit-DailyLimit': '2000', 'RateLimit-Remaining': '10', 'RateLimit-ResetTime': 'soon'})
+        self.assertEqual((budget.daily_limit, budget.remaining), (2000, 10))
+
+        budget.reset_at = time.time() - 1
+        snapshot = budget.snapshot()
+        self.assertEqual(snapshot['remaining'], 2000)
+        self.assertGreater(snapshot['resets_in'], 0)
+
+class YelpQuotaRefundTest(unittest.TestCase):
+    def search(self, pages):
+        budget = QuotaBudget(daily_limit=100)
+        searcher = YelpSearcher(client=FakeClient(pages), budget=budget)
+        return searcher.search_query({'location': 'Austin, TX'}), budget
+
+    def test_failed_pages_are_refunded(self):
+        results, budget = self.search({0: full_page(200, 0), 50: full_page(200, 50),
+                                       100: FakeResponse(status_code=500),
+                                       150: requests.ConnectionError('connection reset')})
+
+        self.assertTrue(results.businesses.partial)
+        # Four pages were acquired, only the two answered ones are spent
+        self.assertEqual(budget.remaining, 98)
+
+    def test_failed_first_page_is_refunded(self):
+        results, budget = self.search({0: FakeResponse(status_code=503)})
+        self.assertEqual(results.businesses.reason, 'Yelp API request failed')
+        self.assertEqual(budget.remaining, 100)
+
+    def test_failure_reporting_the_quota_is_not_refunded(self):
+        # The API's own count already includes the failed call
+        results, budget = self.search({0: FakeResponse(status_code=429, headers={'RateLimit-Remaining': '42'})})
+        self.assertEqual(budget.remaining, 42)
+
+if __name__ == '__main__':
+    unittest.main()
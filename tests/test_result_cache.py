@@ -0,0 +1,162 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from scraper.business import Business
+from scraper.quota import PartialResults
+from scraper.result_cache import CachedSearcher, ResultCache
+
+RESULTS = [Business(name='City Plumbing', phone='(512) 555-0101'), Business(name='Pipe Works')]
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+class Fetch:
+    """Counts upstream calls; with a gate, blocks until the test opens it."""
+
+    def __init__(self, result=RESULTS, gate=None, error=None):
+        self.result = result
+        self.gate = gate
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate:
+            self.gate.wait(5)
+        if self.error:
+            raise self.error
+        return self.result
+
+class CoalescingTest(unittest.TestCase):
+    def concurrent(self, cache, fetch, callers=5):
+        """Start `callers` identical lookups, let the one upstream call finish, and return each outcome."""
+        outcomes = [None] * callers
+
+        def lookup(index):
+            try:
+                outcomes[index] = cache.get_or_fetch('YelpSearcher', ('austin, tx', 5, 'plumbers'), fetch)
+            except Exception as e:
+                outcomes[index] = e
+
+        threads = [threading.Thread(target=lookup, args=(i,)) for i in range(callers)]
+        for thread in threads:
+            thread.start()
+        # Wait until every caller but the leader is queued behind the upstream call
+        deadline = time.monotonic() + 5
+        while cache.stats()['coalesced'] < callers - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        fetch.gate.set()
+        for thread in threads:
+            thread.join(5)
+        return outcomes
+
+    def test_concurrent_misses_share_one_upstream_call(self):
+        cache = ResultCache()
+        fetch = Fetch(gate=threading.Event())
+        outcomes = self.concurrent(cache, fetch)
+
+        self.assertEqual(fetch.calls, 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['coalesced'], 4)
+        self.assertTrue(all(outcome == RESULTS for outcome in outcomes))
+        # Each caller gets its own list
+        self.assertEqual(len({id(outcome) for outcome in outcomes}), 5)
+
+    def test_upstream_error_reaches_every_waiter_and_is_not_cached(self):
+        cache = ResultCache()
+        outcomes = self.concurrent(cache, Fetch(gate=threading.Event(), error=RuntimeError('upstream down')))
+        self.assertTrue(all(isinstance(outcome, RuntimeError) for outcome in outcomes))
+
+        fetch = Fetch()
+        self.assertEqual(cache.get_or_fetch('YelpSearcher', ('austin, tx', 5, 'plumbers'), fetch), RESULTS)
+        self.assertEqual(fetch.calls, 1)
+
+    def test_partial_results_are_shared_but_not_cached(self):
+        cache = ResultCache()
+        partial = PartialResults(RESULTS[:1], 'Yelp daily quota exhausted')
+        outcomes = self.concurrent(cache, Fetch(result=partial, gate=threading.Event()))
+        self.assertTrue(all(outcome.reason == 'Yelp daily quota exhausted' for outcome in outcomes))
+
+        fetch = Fetch()
+        cache.get_or_fetch('YelpSearcher', ('austin, tx', 5, 'plumbers'), fetch)
+        self.assertEqual(fetch.calls, 1)
+
+class ExpiryTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch('scraper.result_cache.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'results.db')
+
+    def lookup(self, cache, source='YelpSearcher', key=('austin, tx', 5, 'plumbers'), result=RESULTS, **kwargs):
+        fetch = Fetch(result=result)
+        value = cache.get_or_fetch(source, key, fetch, **kwargs)
+        return value, fetch.calls
+
+    def test_entries_expire_after_their_source_ttl(self):
+        cache = ResultCache(default_ttl=60)
+        self.assertEqual(self.lookup(cache), (RESULTS, 1))
+        self.assertEqual(self.lookup(cache, source='SimpleReliableScraper'), (RESULTS, 1))
+
+        self.clock.now += 61
+        self.assertEqual(self.lookup(cache)[1], 0)
+        self.assertEqual(self.lookup(cache, source='SimpleReliableScraper')[1], 1)
+
+        self.clock.now += 3600
+        self.assertEqual(self.lookup(cache)[1], 1)
+        self.assertEqual(self.lookup(cache, ttl=10)[1], 0)
+
+    def test_empty_results_are_not_cached(self):
+        cache = ResultCache()
+        self.lookup(cache, result=[])
+        self.assertEqual(self.lookup(cache), (RESULTS, 1))
+
+    def test_disk_tier_survives_restarts_until_expiry(self):
+        cache = ResultCache(disk_path=self.path)
+        self.lookup(cache)
+
+        restarted = ResultCache(disk_path=self.path)
+        value, calls = self.lookup(restarted)
+        self.assertEqual((value, calls), (RESULTS, 0))
+        self.assertEqual(restarted.stats()['disk_hits'], 1)
+
+        self.clock.now += 3601
+        self.assertEqual(self.lookup(ResultCache(disk_path=self.path))[1], 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResultCache(max_entries=2)
+        for city in ('austin', 'dallas', 'austin', 'houston'):
+            self.lookup(cache, key=(city, 5, 'plumbers'))
+
+        self.assertEqual(self.lookup(cache, key=('austin', 5, 'plumbers'))[1], 0)
+        self.assertEqual(self.lookup(cache, key=('dallas', 5, 'plumbers'))[1], 1)
+
+    def test_cached_searcher_normalizes_the_search(self):
+        class Searcher:
+            calls = 0
+
+            def search_businesses(self, location, radius, category):
+                Searcher.calls += 1
+                return RESULTS
+
+        searcher = CachedSearcher(Searcher(), ResultCache())
+        searcher.search_businesses('Austin,  TX', 5, 'Plumbers ')
+        searcher.search_businesses(' austin, tx', 5, 'plumbers')
+        self.assertEqual(Searcher.calls, 1)
+        searcher.search_businesses('austin, tx', 10, 'plumbers')
+        self.assertEqual(Searcher.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import math
+import random
+import unittest
+
+from scraper.business import Business
+from scraper.quota import PartialResults
+from scraper.tiling import MAX_RADIUS_METERS, METERS_PER_DEGREE_LAT, Tile, TiledYelpSearcher, plan_grid
+from scraper.yelp_api import YelpResults
+
+def meters(latitude, longitude, other_latitude, other_longitude):
+    # Equirectangular distance, plenty accurate at metro scale
+    x = (other_longitude - longitude) * math.cos(math.radians((latitude + other_latitude) / 2))
+    return math.hypot(other_latitude - latitude, x) * METERS_PER_DEGREE_LAT
+
+class PlanGridTest(unittest.TestCase):
+    def assert_partition(self, tiles, latitude, longitude, radius_meters):
+        """Every point of the square around the center falls in exactly one tile."""
+        half_lat = radius_meters / METERS_PER_DEGREE_LAT
+        half_lon = half_lat / math.cos(math.radians(latitude))
+        rng = random.Random(7)
+        for _ in range(2000):
+            point = (latitude + rng.uniform(-0.999, 0.999) * half_lat, longitude + rng.uniform(-0.999, 0.999) * half_lon)
+            self.assertEqual(sum(tile.contains(*point) for tile in tiles), 1, point)
+
+    def test_small_area_is_one_tile(self):
+        tiles = plan_grid(30.27, -97.74, 20000)
+        self.assertEqual(len(tiles), 1)
+        self.assertLessEqual(tiles[0].radius, MAX_RADIUS_METERS)
+
+    def test_large_area_is_a_grid_of_searchable_tiles(self):
+        tiles = plan_grid(30.27, -97.74, 80000)
+        self.assertEqual(len(tiles), 9)
+        self.assertTrue(all(tile.radius <= MAX_RADIUS_METERS for tile in tiles))
+        self.assert_partition(tiles, 30.27, -97.74, 80000)
+
+    def test_high_latitude_cells_are_split_until_searchable(self):
+        # A 2x2 grid whose equator-side cells are too wide for one search that far north
+        tiles = plan_grid(70.0, 25.0, 56000)
+        self.assertEqual(len(tiles), 10)
+        self.assertTrue(all(tile.radius <= MAX_RADIUS_METERS for tile in tiles))
+        self.assert_partition(tiles, 70.0, 25.0, 56000)
+
+    def test_split_quarters_the_tile(self):
+        tile = Tile(30.0, -97.0, 0.1, 0.12)
+        children = tile.split()
+        self.assertEqual(len(children), 4)
+        self.assertTrue(all((child.half_lat, child.half_lon) == (0.05, 0.06) for child in children))
+        # Corners and shared edges each belong to exactly one quarter
+        for point in [(29.9, -97.12), (30.0, -97.0), (30.0, -97.06), (29.95, -97.0), (30.0999, -96.8801)]:
+            self.assertTrue(tile.contains(*point))
+            self.assertEqual(sum(child.contains(*point) for child in children), 1, point)
+
+    def test_contains_is_half_open(self):
+        tile = Tile(30.0, -97.0, 0.1, 0.1)
+        self.assertTrue(tile.contains(29.9, -97.1))
+        self.assertFalse(tile.contains(30.1, -97.0))
+        self.assertFalse(tile.contains(30.0, -96.9))
+
+class FakeYelp:
+    """Returns every business inside the search circle, reporting the full count like Yelp."""
+
+    api_key = 'test'
+    max_results = 5
+
+    def __init__(self, businesses):
+        self.businesses = businesses
+        self.searches = []
+
+    def search_query(self, params, priority=None, stop_over_cap=False):
+        if 'location' in params:
+            return YelpResults([], 10 * len(self.businesses), {'latitude': 30.27, 'longitude': -97.74})
+
+        self.searches.append(params)
+        found = [b for b in self.businesses
+                 if meters(params['latitude'], params['longitude'], b.latitude, b.longitude) <= params['radius']]
+        return YelpResults(found[:self.max_results], len(found), None)
+
+class TiledSearchTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        # A dense downtown plus scattered suburbs
+        points = ([(30.27 + rng.gauss(0, 0.01), -97.74 + rng.gauss(0, 0.01)) for _ in range(40)] +
+                  [(30.27 + rng.uniform(-0.3, 0.3), -97.74 + rng.uniform(-0.3, 0.3)) for _ in range(20)])
+        self.businesses = [Business(name=f'Shop {i}', id=f'id{i}', latitude=lat, longitude=lon)
+                           for i, (lat, lon) in enumerate(points)]
+
+    def test_dense_cells_are_subdivided_and_each_business_kept_once(self):
+        yelp = FakeYelp(self.businesses)
+        results = TiledYelpSearcher(yelp, min_half_size=100).search_businesses('Austin, TX', 25)
+
+        self.assertNotIsInstance(results, PartialResults)
+        self.assertEqual(sorted(b.id for b in results), sorted(b.id for b in self.businesses))
+        # More searches than the first grid: the downtown cells were split
+        self.assertGreater(len(yelp.searches), len(plan_grid(30.27, -97.74, 25 * 1609.34)))
+
+    def test_tile_limit_returns_partial_results(self):
+        results = TiledYelpSearcher(FakeYelp(self.businesses), min_half_size=100, max_tiles=3).search_businesses(
+            'Austin, TX', 25)
+        self.assertIsInstance(results, PartialResults)
+        self.assertEqual(results.reason, 'Stopped after 3 tiles')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import os
+import tempfile
+import unittest
+
+from scraper.validation_cache import ValidationCache
+
+class ValidationCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = ValidationCache(path=os.path.join(directory.name, 'validation.db'))
+        self.addCleanup(self.cache.close)
+
+    def test_equivalent_urls_share_an_entry(self):
+        self.cache.set('http://www.Example.com/', True)
+        self.assertTrue(self.cache.get('example.com'))
+        self.assertIsNone(self.cache.get('example.com:8080'))
+
+    def test_malformed_url_does_not_fail_the_batch(self):
+        urls = ['http://example.com:abc', 'http://[::1', 'example.com']
+        self.cache.set_many({url: False for url in urls[:2]})
+        self.cache.set('example.com', True)
+
+        self.assertEqual(self.cache.get_many(urls), {'http://example.com:abc': False, 'http://[::1': False,
+                                                     'example.com': True})
+
+if __name__ == '__main__':
+    unittest.main()
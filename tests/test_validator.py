@@ -0,0 +1,52 @@
+import threading
+import time
+import unittest
+
+from scraper.business import Business
+from scraper.validator import WebsiteValidator
+
+class MalformedUrlTest(unittest.TestCase):
+    """urllib3 rejects URLs like these before sending anything, so no network is needed."""
+
+    def setUp(self):
+        self.validator = WebsiteValidator(cache=None)
+
+    def test_malformed_url_is_not_a_website(self):
+        self.assertFalse(self.validator.validate_url('www.cityplumbingco..com'))
+
+    def test_malformed_url_does_not_fail_the_batch(self):
+        businesses = [Business(name='City Plumbing Co', url='www.cityplumbingco..com'),
+                      Business(name='No Website')]
+        self.assertEqual(self.validator.has_websites(businesses), [False, False])
+        self.assertEqual(list(self.validator.iter_has_websites(businesses)), [(1, False), (0, False)])
+
+class HostSlotTest(unittest.TestCase):
+    class SlowClient:
+        """Answers every HEAD with a 200 after a short wait, recording the busiest moment per host."""
+
+        def __init__(self):
+            self.active = {}
+            self.peak = {}
+            self.lock = threading.Lock()
+
+        def head(self, url, **kwargs):
+            host = url.split('/')[2]
+            with self.lock:
+                self.active[host] = self.active.get(host, 0) + 1
+                self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+            time.sleep(0.01)
+            with self.lock:
+                self.active[host] -= 1
+            return type('Response', (), {'status_code': 200})()
+
+    def test_per_host_limit_and_idle_hosts_are_dropped(self):
+        client = self.SlowClient()
+        validator = WebsiteValidator(cache=None, client=client, max_workers=16, per_host_limit=2)
+        urls = [f'http://site{i % 3}.example.com/page{i}' for i in range(24)]
+
+        self.assertTrue(all(validator.validate_many(urls).values()))
+        self.assertLessEqual(max(client.peak.values()), 2)
+        self.assertEqual(validator._host_slots, {})
+
+if __name__ == '__main__':
+    unittest.main()